@@ -0,0 +1,148 @@
+import threading
+import time
+from api.neo4j import init_driver
+from api.dao.general import GeneralDAO
+from api.snapshot import read_snapshot, write_snapshot
+
+# Default time to live of a shared table, in seconds. Tables are keyed by the graph
+# fingerprint, so they can live until the graph changes.
+DEFAULT_TTL = None
+
+# How often the graph fingerprint is polled, in seconds
+FINGERPRINT_POLL_INTERVAL = 60
+
+# Last polled graph fingerprint
+_fingerprint = None
+_fingerprint_polled_at = None
+_fingerprint_lock = threading.Lock()
+
+# Get the current graph fingerprint, polling Neo4j at most once per interval
+def get_graph_fingerprint():
+    global _fingerprint, _fingerprint_polled_at
+    now = time.monotonic()
+    if _fingerprint_polled_at is not None and now - _fingerprint_polled_at < FINGERPRINT_POLL_INTERVAL:
+        return _fingerprint
+
+    with _fingerprint_lock:
+        if _fingerprint_polled_at is None or now - _fingerprint_polled_at >= FINGERPRINT_POLL_INTERVAL:
+            try:
+                _fingerprint = GeneralDAO(init_driver()).get_graph_fingerprint()
+            except Exception as e:
+                # Keep serving the last known fingerprint if Neo4j cannot be reached
+                print(f"Error polling the graph fingerprint: {e}")
+            _fingerprint_polled_at = now
+    return _fingerprint
+
+# A read-only value loaded once per process and shared by every browser session.
+# The value is keyed by the graph fingerprint and rebuilt after the graph is reloaded.
+# Callers must not modify the returned value, copy it first if needed.
+#
+# With `snapshot` set, the value is also written to disk as a DataFrame (`encode` and `decode`
+# convert other values). After a restart the snapshot is served right away and revalidated
+# against the graph fingerprint in the background.
+class SharedTable:
+
+    def __init__(self, name, build, ttl=DEFAULT_TTL, snapshot=False, encode=None, decode=None):
+        self.name = name
+        self.build = build
+        self.ttl = ttl
+        self.snapshot = snapshot
+        self.encode = encode or (lambda value: value)
+        self.decode = decode or (lambda frame: frame)
+        self._value = None
+        self._fingerprint = None
+        self._loaded_at = None
+        self._revalidating = False
+        self._snapshot_checked = False
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, fingerprint):
+        if self._value is None or self._fingerprint != fingerprint:
+            return False
+        return self.ttl is None or time.monotonic() - self._loaded_at < self.ttl
+
+    # Get the shared value, only the first caller after a graph change, refresh or expiry runs the build
+    def get(self):
+        if self.snapshot and not self._snapshot_checked and self._load_snapshot():
+            return self._value
+        # Serve the snapshot while the background revalidation is running
+        if self._revalidating:
+            return self._value
+
+        fingerprint = get_graph_fingerprint()
+        if not self._is_fresh(fingerprint):
+            with self._lock:
+                if not self._is_fresh(fingerprint):
+                    self._rebuild(fingerprint)
+        return self._value
+
+    def _rebuild(self, fingerprint):
+        self._value = self.build()
+        self._fingerprint = fingerprint
+        self._loaded_at = time.monotonic()
+        if self.snapshot:
+            try:
+                write_snapshot(self.name, self.encode(self._value), fingerprint)
+            except Exception as e:
+                print(f"Error writing snapshot {self.name}: {e}")
+
+    # Load the on-disk snapshot on a cold start and revalidate it in the background
+    def _load_snapshot(self):
+        with self._lock:
+            if self._snapshot_checked:
+                return self._value is not None
+            # The snapshot is only read on a cold start, later refreshes rebuild from Neo4j
+            self._snapshot_checked = True
+            frame, fingerprint = read_snapshot(self.name)
+            if frame is None:
+                return False
+            self._value = self.decode(frame)
+            self._fingerprint = fingerprint
+            self._loaded_at = time.monotonic()
+            self._revalidating = True
+        threading.Thread(target=self._revalidate, name=f"revalidate-{self.name}", daemon=True).start()
+        return True
+
+    def _revalidate(self):
+        try:
+            fingerprint = get_graph_fingerprint()
+            with self._lock:
+                if fingerprint is not None and fingerprint != self._fingerprint:
+                    self._rebuild(fingerprint)
+        except Exception as e:
+            print(f"Error revalidating {self.name}: {e}")
+        finally:
+            self._revalidating = False
+
+    # Drop the shared value so the next caller rebuilds it
+    def refresh(self):
+        with self._lock:
+            self._value = None
+            self._fingerprint = None
+            self._loaded_at = None
+
+# Shared tables of the process, by name
+_tables = {}
+_tables_lock = threading.Lock()
+
+# Get the shared table registered under `name`, registering it on first use
+def shared_table(name, build, ttl=DEFAULT_TTL, snapshot=False, encode=None, decode=None):
+    with _tables_lock:
+        if name not in _tables:
+            _tables[name] = SharedTable(name, build, ttl, snapshot, encode, decode)
+        return _tables[name]
+
+# Get a shared table holding a DataFrame from `load()` together with `index(frame)`, as a (frame, index)
+# pair. Both are rebuilt together, so an index is always built from the exact frame it filters; only
+# the frame is written to the snapshot and the index is rebuilt from it after a restart.
+def shared_indexed_table(name, load, index, ttl=DEFAULT_TTL):
+    def build_pair(frame):
+        return frame, index(frame)
+    return shared_table(name, lambda: build_pair(load()), ttl, snapshot=True, encode=lambda value: value[0], decode=build_pair)
+
+# Drop every shared table so they are rebuilt on next use
+def refresh_shared_tables():
+    with _tables_lock:
+        tables = list(_tables.values())
+    for table in tables:
+        table.refresh()
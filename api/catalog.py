@@ -0,0 +1,160 @@
+import os
+import json
+import time
+import threading
+from api.neo4j import init_driver
+from api.dao.general import GeneralDAO, build_ontology_elements
+from api.snapshot import SNAPSHOT_DIR
+
+# File holding the persisted schema and statistics catalog
+CATALOG_PATH = os.path.join(SNAPSHOT_DIR, "schema_catalog.json")
+
+# How often the background thread checks the graph for changes, in seconds
+CATALOG_REFRESH_INTERVAL = 600
+
+# Schema and statistics of the graph, built once, persisted to disk and refreshed in the background.
+# It serves the ontology page, the LangChain graph schema and the SPARQL ontology, so none of them
+# introspects a live backend on the request path.
+class SchemaCatalog:
+
+    def __init__(self, data):
+        self.data = data
+
+    @property
+    def fingerprint(self):
+        return self.data.get("fingerprint")
+
+    # Instance count of every label
+    def get_label_counts(self):
+        return self.data["labels"]
+
+    # Profiled attributes of a label: key, caption, examples and null ratio
+    def get_label_profile(self, label):
+        return self.data["label_profiles"].get(label, [])
+
+    # Elements of the ontology view
+    def get_ontology_elements(self):
+        return build_ontology_elements(self.data["labels"], self.data["relationships"])
+
+    # Structured schema in the format used by LangChain's Neo4jGraph
+    def get_structured_schema(self):
+        return {
+            "node_props": {label: props for label, props in self.data["node_properties"].items() if props},
+            "rel_props": self.data["relationship_properties"],
+            "relationships": self.data["relationships"],
+            "metadata": {"constraint": [], "index": []},
+        }
+
+    # Schema string in the format used by LangChain's Neo4jGraph
+    def get_schema_string(self):
+        schema = self.get_structured_schema()
+        node_props = [f"{label} {{{', '.join(prop['property'] + ': ' + prop['type'] for prop in props)}}}" for label, props in schema["node_props"].items()]
+        rel_props = [f"{rel_type} {{{', '.join(prop['property'] + ': ' + prop['type'] for prop in props)}}}" for rel_type, props in schema["rel_props"].items()]
+        rels = [f"(:{rel['start']})-[:{rel['type']}]->(:{rel['end']})" for rel in schema["relationships"]]
+        return "\n".join([
+            "Node properties:",
+            "\n".join(node_props),
+            "Relationship properties:",
+            "\n".join(rel_props),
+            "The relationships:",
+            "\n".join(rels),
+        ])
+
+    # SPARQL ontology rows of an endpoint, fetched with `fetch_rows` the first time the endpoint is seen.
+    # The rows are fetched outside the catalog lock, which is only held to store and save them.
+    def get_sparql_ontology(self, endpoint, fetch_rows):
+        with _catalog_lock:
+            _sparql_fetchers[endpoint] = fetch_rows
+            rows = self.data.get("sparql_ontologies", {}).get(endpoint)
+        if rows is not None:
+            return rows
+
+        rows = fetch_rows()
+        if not rows:
+            return rows
+        with _catalog_lock:
+            self.data.setdefault("sparql_ontologies", {})[endpoint] = rows
+            _save_catalog(self)
+        return rows
+
+# Build the catalog from Neo4j: schema, counts, property types and sampled attribute profiles
+def build_catalog():
+    dao = GeneralDAO(init_driver())
+    fingerprint = dao.get_graph_fingerprint()
+    data = dao.get_schema()
+    data["label_profiles"] = {label: dao.get_label_profile(label) for label in data["labels"]}
+    data["fingerprint"] = fingerprint
+    data["built_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    return SchemaCatalog(data)
+
+def _load_catalog():
+    try:
+        with open(CATALOG_PATH, "r") as f:
+            return SchemaCatalog(json.load(f))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Error reading schema catalog {CATALOG_PATH}: {e}")
+        return None
+
+def _save_catalog(catalog):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    temporary_path = CATALOG_PATH + ".tmp"
+    with open(temporary_path, "w") as f:
+        json.dump(catalog.data, f, indent=2, default=str)
+    os.replace(temporary_path, CATALOG_PATH)
+
+# The catalog of the process and the thread keeping it fresh
+_catalog = None
+_sparql_fetchers = {}
+_catalog_lock = threading.Lock()
+_refresh_thread = None
+_refresh_callbacks = []
+
+# Call `callback(catalog)` with every catalog built after the graph changes, for consumers that copy
+# the schema, such as the LangChain graph and chain
+def on_catalog_refresh(callback):
+    with _catalog_lock:
+        _refresh_callbacks.append(callback)
+
+# Rebuild the catalog whenever the graph fingerprint changes
+def _refresh_loop():
+    global _catalog
+    while True:
+        try:
+            fingerprint = GeneralDAO(init_driver()).get_graph_fingerprint()
+            if fingerprint != _catalog.fingerprint:
+                catalog = build_catalog()
+                # Refetch the SPARQL ontologies seen by this process, keep the others
+                with _catalog_lock:
+                    fetchers = dict(_sparql_fetchers)
+                fetched = {endpoint: fetch_rows() for endpoint, fetch_rows in fetchers.items()}
+                with _catalog_lock:
+                    ontologies = dict(_catalog.data.get("sparql_ontologies", {}))
+                    ontologies.update({endpoint: rows for endpoint, rows in fetched.items() if rows})
+                    catalog.data["sparql_ontologies"] = ontologies
+                    _save_catalog(catalog)
+                    _catalog = catalog
+                    callbacks = list(_refresh_callbacks)
+                for callback in callbacks:
+                    callback(catalog)
+        except Exception as e:
+            print(f"Error refreshing schema catalog: {e}")
+        time.sleep(CATALOG_REFRESH_INTERVAL)
+
+# Get the schema catalog, from memory, then disk, and only built from Neo4j when neither exists
+def get_catalog():
+    global _catalog, _refresh_thread
+    if _catalog is not None:
+        return _catalog
+
+    with _catalog_lock:
+        if _catalog is None:
+            catalog = _load_catalog()
+            if catalog is None:
+                catalog = build_catalog()
+                _save_catalog(catalog)
+            _catalog = catalog
+            _refresh_thread = threading.Thread(target=_refresh_loop, name="schema-catalog-refresh", daemon=True)
+            _refresh_thread.start()
+    return _catalog
@@ -1,32 +1,65 @@
 import pandas as pd
+from api.frames import materialize, property_dtype
+from api.dao.nodes import get_id_page, get_node_count, get_properties, get_properties_batch
+
+# Sample and event labels shown on the experimental unit page, grouped by tab
+MEASUREMENT_SAMPLES = ["GasSample", "SoilBiologicalSample", "BioMassEnergy", "SoilChemicalSample", "SoilPhysicalSample", "GasNutrientLoss", "BioMassCarbohydrate", "BioMassMineral", "WaterQualityArea", "WindErosionArea", "YieldNutrientUptake", "WaterQualityConc"]
+PLANTING_AND_HARVESTING_SAMPLES = ["Grazing","HarvestFraction", "PlantingEvent", "CropGrowthStage", "Harvest"]
+MANAGEMENT_EVENTS = ["Amendment", "Tillage", "ResidueManagementEvent","GrazingManagementEvent", "Treatment"]
+ALL_SAMPLES = MEASUREMENT_SAMPLES + PLANTING_AND_HARVESTING_SAMPLES + MANAGEMENT_EVENTS
+
+# Number of samples of each type included in an experimental unit profile
+SAMPLE_PAGE_SIZE = 1000
+
+# Drop the columns and rows of a sample DataFrame that hold no values
+def drop_empty(dataframe):
+    # drop columns with all missing values
+    dataframe = dataframe.dropna(axis=1, how='all')
+    # drop rows with all missing values
+    dataframe = dataframe.dropna(axis=0, how='all')
+    return dataframe
+
+# Transaction function counting the samples of each type connected to an experimental unit
+def get_sample_counts(tx, expUnit_id):
+    cypher = """MATCH (u:ExperimentalUnit {expUnitId: $expUnit_id})-[]-(s)
+                UNWIND labels(s) AS label
+                WITH label WHERE label IN $labels
+                RETURN label, count(*) as count"""
+    result = tx.run(cypher, expUnit_id=expUnit_id, labels=ALL_SAMPLES)
+    label_counts = {record["label"]: int(record["count"]) for record in result}
+    # Labels without any neighbour are not returned by the query
+    return {sample: label_counts.get(sample, 0) for sample in ALL_SAMPLES}
+
+# Transaction function reading the samples of one type connected to an experimental unit, at most `limit`
+def get_samples(tx, expUnit_id, sample_type, limit=None):
+    cypher = """MATCH (u:ExperimentalUnit {expUnitId: $expUnit_id})-[]-(s)
+                WHERE ANY(label IN labels(s) WHERE label = $sample_type)
+                RETURN properties(s) AS properties"""
+    if limit is not None:
+        cypher += " LIMIT $limit"
+    result = tx.run(cypher, expUnit_id=expUnit_id, sample_type=sample_type, limit=limit)
+    return materialize(result, schema=property_dtype, properties="properties")
 
 class ExperimentalUnitDAO:
 
     def __init__(self, driver):
         self.driver = driver
     
-    # get the unique ID of all experimental units
-    def get_all_ids(self):
-        def get_exp_units(tx):
-            cypher = "MATCH (u:ExperimentalUnit) RETURN u as exp_units"
-            result = tx.run(cypher)
-            return [record["exp_units"]["expUnit_UID"] for record in result]
-        
-        with self.driver.session() as session:
-            return session.execute_read(get_exp_units)
+    # get the unique ID of all experimental units, optionally one page after a given ID
+    def get_all_ids(self, after=None, limit=None):
+        return get_id_page(self.driver, "ExperimentalUnit", "expUnit_UID", after=after, limit=limit)
+    
+    # get the total number of experimental units
+    def get_id_count(self):
+        return get_node_count(self.driver, "ExperimentalUnit")
 
-    # Get experimental unit information
+    # Get the property map of an experimental unit
     def get_exp_unit_info(self, expUnit_id):
-            def get_exp_unit_info(tx):
-                cypher = """MATCH (u:ExperimentalUnit {expUnit_UID: $expUnit_id})
-                            WITH u, keys(u) AS keys
-                            UNWIND keys AS key
-                            RETURN key, apoc.map.get(u, key) AS property"""
-                result = tx.run(cypher, expUnit_id=expUnit_id)
-                return result.to_df()
-            
-            with self.driver.session() as session:
-                return session.execute_read(get_exp_unit_info)
+        return get_properties(self.driver, "ExperimentalUnit", "expUnit_UID", expUnit_id)
+
+    # Get the property maps of many experimental units in one query, by ID
+    def get_exp_unit_infos(self, expUnit_ids):
+        return get_properties_batch(self.driver, "ExperimentalUnit", "expUnit_UID", expUnit_ids)
     
     # get all treatments applied to an experimental unit
     def get_all_treatments(self, expUnit_id):
@@ -118,13 +151,11 @@ class ExperimentalUnitDAO:
         def get_biological_properties(tx):
             cypher = """
             MATCH (u:ExperimentalUnit {expUnit_UID: $expUnit_id})-[:hasBioSample]->(s:SoilBiologicalSample)
-            RETURN apoc.map.fromPairs([key IN keys(s) | [key, s[key]]]) AS properties
+            RETURN properties(s) AS properties
             ORDER BY s.soilBiolDate ASC
             """
             result = tx.run(cypher, expUnit_id=expUnit_id)
-            # Convert the result to a pandas DataFrame
-            data = [record['properties'] for record in result]
-            return pd.DataFrame(data)
+            return materialize(result, schema=property_dtype, properties="properties")
         
         with self.driver.session() as session:
             return session.execute_read(get_biological_properties)
@@ -169,46 +200,64 @@ class ExperimentalUnitDAO:
         with self.driver.session() as session:
             return session.execute_read(get_sample_count)
     
+    # Get the neighbour count of every sample and event label of an experimental unit in one query
+    def get_all_sample_counts(self, expUnit_id):
+        with self.driver.session() as session:
+            return session.execute_read(get_sample_counts, expUnit_id)
+    
     # Get the count of all samples connected to an experimental unit
-    def get_all_measurement_sample_counts(self, expUnit_id):
-        samples = ["GasSample", "SoilBiologicalSample", "BioMassEnergy", "SoilChemicalSample", "SoilPhysicalSample", "GasNutrientLoss", "BioMassCarbohydrate", "BioMassMineral", "WaterQualityArea", "WindErosionArea", "YieldNutrientUptake", "WaterQualityConc"]
-        sample_counts = {}
-        for sample in samples:
-            sample_counts[sample] = self.get_sample_count(expUnit_id, sample)
-        return sample_counts
+    def get_all_measurement_sample_counts(self, expUnit_id, sample_counts=None):
+        if sample_counts is None:
+            sample_counts = self.get_all_sample_counts(expUnit_id)
+        return {sample: sample_counts[sample] for sample in MEASUREMENT_SAMPLES}
         
     # Get the count of all planting and harvest samples connected to an experimental unit
-    def get_all_planting_and_harvesting_sample_counts(self, expUnit_id):
-        samples = ["Grazing","HarvestFraction", "PlantingEvent", "CropGrowthStage", "Harvest"]
-        sample_counts = {}
-        for sample in samples:
-            sample_counts[sample] = self.get_sample_count(expUnit_id, sample)
-        return sample_counts
+    def get_all_planting_and_harvesting_sample_counts(self, expUnit_id, sample_counts=None):
+        if sample_counts is None:
+            sample_counts = self.get_all_sample_counts(expUnit_id)
+        return {sample: sample_counts[sample] for sample in PLANTING_AND_HARVESTING_SAMPLES}
 
     # Get all management events applied to an experimental unit
-    def get_all_mamagement_events(self, expUnit_id):
-        samples = ["Amendment", "Tillage", "ResidueManagementEvent","GrazingManagementEvent", "Treatment"]
-        sample_counts = {}
-        for sample in samples:
-            sample_counts[sample] = self.get_sample_count(expUnit_id, sample)
-        return sample_counts
+    def get_all_mamagement_events(self, expUnit_id, sample_counts=None):
+        if sample_counts is None:
+            sample_counts = self.get_all_sample_counts(expUnit_id)
+        return {sample: sample_counts[sample] for sample in MANAGEMENT_EVENTS}
     
     # Get data sample information for an experimental unit
     def get_all_data_samples(self, expUnit_id, sample_type):
-        def get_data_samples(tx):
-            cypher = """MATCH (u:ExperimentalUnit {expUnitId: $expUnit_id})-[]-(s)
-                        WHERE ANY(label IN labels(s) WHERE label = $sample_type)
-                        RETURN apoc.map.fromPairs([key IN keys(s) | [key, s[key]]]) AS properties"""
-            result = tx.run(cypher, expUnit_id=expUnit_id, sample_type=sample_type)
-            data = [record['properties'] for record in result]
-            dataframe = pd.DataFrame(data)
-            # drop columns with all missing values
-            dataframe = dataframe.dropna(axis=1, how='all')
-            # drop rows with all missing values
-            dataframe = dataframe.dropna(axis=0, how='all')
-            # replace None with "Not Available"
-            dataframe = dataframe.fillna("Not Available")
-            return dataframe
+        with self.driver.session() as session:
+            return drop_empty(session.execute_read(get_samples, expUnit_id, sample_type))
+    
+    # Get everything the experimental unit detail view needs in a single read transaction:
+    # the sample counts, the treatments and the first page of each sample type with the number of samples
+    # it holds, which can be more than its rows once the empty rows are dropped
+    def get_unit_profile(self, expUnit_id, page_size=SAMPLE_PAGE_SIZE):
+        def get_unit_profile(tx):
+            cypher = """MATCH (u:ExperimentalUnit {expUnitId: $expUnit_id})<-[:appliedInExpUnit]-(t:Treatment)
+                        RETURN
+                            t.treatmentId AS ID,
+                            t.treatmentDescriptor AS Name,
+                            t.treatmentStartDate AS Start_Date,
+                            t.treatmentEndDate AS End_Date
+                        ORDER BY t.treatmentStartDate ASC"""
+            treatments = tx.run(cypher, expUnit_id=expUnit_id).to_df()
+
+            # Counting reads no properties, only the sample types found are paged, typed the same way
+            # as get_all_data_samples
+            sample_counts = get_sample_counts(tx, expUnit_id)
+            samples, page_counts = {}, {}
+            for label, count in sample_counts.items():
+                if count:
+                    page = get_samples(tx, expUnit_id, label, limit=page_size)
+                    page_counts[label] = len(page)
+                    samples[label] = drop_empty(page)
+
+            return {
+                "sample_counts": sample_counts,
+                "treatments": treatments,
+                "samples": samples,
+                "page_counts": page_counts,
+            }
         
         with self.driver.session() as session:
-            return session.execute_read(get_data_samples)
\ No newline at end of file
+            return session.execute_read(get_unit_profile)
@@ -1,21 +1,19 @@
 import pandas as pd
+from api.frames import materialize
+from api.dao.nodes import get_id_page, get_node_count
 
 class FieldDAO:
 
     def __init__(self, driver):
         self.driver = driver
     
-    # get the unique ID of all experimental units
-    def get_all_ids(self):
-        # transaction function
-        def get_fiel_ids(tx):
-            cypher = "MATCH (f:Field) RETURN f as field"
-            result = tx.run(cypher)
-            return [record["field"]['fieldId'] for record in result]
-        
-        # execute transaction
-        with self.driver.session() as session:
-            return session.execute_read(get_fiel_ids)
+    # get the unique ID of all fields, optionally one page after a given ID
+    def get_all_ids(self, after=None, limit=None):
+        return get_id_page(self.driver, "Field", "fieldId", after=after, limit=limit)
+    
+    # get the total number of fields
+    def get_id_count(self):
+        return get_node_count(self.driver, "Field")
     
     
     # get latitude and longitude of a field
@@ -37,44 +35,20 @@ class FieldDAO:
             })
             return df
     
-    # get rainfall data of a field
-    def get_rainfall_df(self, field_id):
+    # get the daily weather observations of a field, ordered by date
+    def get_daily_weather(self, field_id):
 
         # transaction function
-        def get_rainfall(tx):
+        def get_daily_weather(tx):
             cypher = """MATCH (f:Field {fieldId: $field_id})<-[:weatherAtField]-(w:WeatherObservation)
-                        WITH w.date AS date, w.precipitation_mm_per_d AS precipitation
-                        WITH date, precipitation,
-                            toInteger(substring(date, 0, 4)) AS year,
-                            toInteger(substring(date, 5, 2)) AS month
-                        WITH year,
-                            CASE
-                                WHEN month IN [1, 2, 3] THEN 'Q1'
-                                WHEN month IN [4, 5, 6] THEN 'Q2'
-                                WHEN month IN [7, 8, 9] THEN 'Q3'
-                                ELSE 'Q4'
-                            END AS quarter,
-                            precipitation
-                        WITH year + '-' + quarter AS period, SUM(precipitation) AS totalPrecipitation
-                        RETURN period, round(totalPrecipitation, 3) AS totalPrecipitation
-                        ORDER BY period ASC"""
+                        RETURN w.date AS date, properties(w) AS properties
+                        ORDER BY w.date ASC"""
             result = tx.run(cypher, field_id=field_id)
-            date = []
-            precipitation = []
-            
-            for record in result:
-                date.append(record['period'])
-                precipitation.append(record['totalPrecipitation'])
-            return date, precipitation
+            return materialize(result, schema={'date': 'datetime64[ns]'}, properties='properties')
         
         # execute transaction
         with self.driver.session() as session:
-            date, precipitation = session.execute_read(get_rainfall)
-            df = pd.DataFrame({
-                'Period': date,
-                'TotalPrecipitation': precipitation
-            })
-            return df
+            return session.execute_read(get_daily_weather)
             
     # get all experimental units in a field
     def get_all_experimental_unit(self, field_id):
@@ -125,21 +99,23 @@ class FieldDAO:
             soil_series = result['Soil_Series']
             return soil_series
     
-    # get some extra information of a field from site
+    # get the property map of the site of a field
     def get_field_info(self, field_id):
+        return self.get_field_infos([field_id]).get(field_id, {})
+
+    # get the property maps of the sites of many fields in one query, by field ID
+    def get_field_infos(self, field_ids):
         # transaction function
-        def get_field_info(tx):
-            cypher = """MATCH (f:Field {fieldId: $field_id})<-[:hasField]-(s:Site)
-                        WITH s, keys(s) AS keys
-                            UNWIND keys AS key
-                            RETURN key, apoc.map.get(s, key) AS property
-                    """
-            result = tx.run(cypher, field_id=field_id)
-            return result.to_df()
+        def get_field_infos(tx):
+            cypher = """UNWIND $field_ids AS field_id
+                        MATCH (f:Field {fieldId: field_id})<-[:hasField]-(s:Site)
+                        RETURN field_id, properties(s) AS properties"""
+            result = tx.run(cypher, field_ids=list(field_ids))
+            return {record['field_id']: record['properties'] for record in result}
         
         # execute transaction
         with self.driver.session() as session:
-            return session.execute_read(get_field_info)
+            return session.execute_read(get_field_infos)
     
     
     # get weather station information of a field
@@ -1,5 +1,8 @@
 import neo4j
+import pandas as pd
 import re
+import json
+import hashlib
 
 # Function to convert camel case to normal case
 def camel_to_normal(camel_str):
@@ -21,6 +24,98 @@ def camel_snake_to_normal(camel_snake_str):
     else:   
         return camel_to_normal(camel_snake_str)
 
+# Limits of queries run through GeneralDAO.run_guarded_query
+MAX_ESTIMATED_ROWS = 1000000
+QUERY_TIMEOUT = 30
+QUERY_FETCH_SIZE = 1000
+MAX_RESULT_ROWS = 10000
+
+# Raised when the planner estimates a query returns more rows than the budget allows
+class QueryBudgetExceeded(Exception):
+    pass
+
+# Leading EXPLAIN/PROFILE keyword and CYPHER option prefix of a query
+EXPLAIN_OR_PROFILE_PREFIX = re.compile(r"^\s*(EXPLAIN|PROFILE)\b", re.IGNORECASE)
+CYPHER_OPTIONS_PREFIX = re.compile(r"^\s*CYPHER\b", re.IGNORECASE)
+
+# Normalise an untrusted query before it is planned: a leading EXPLAIN or PROFILE is dropped so the
+# query itself is planned and guarded, and queries with CYPHER options are rejected
+def normalize_guarded_query(cypher_query):
+    cypher_query = EXPLAIN_OR_PROFILE_PREFIX.sub("", cypher_query, count=1).strip()
+    if CYPHER_OPTIONS_PREFIX.match(cypher_query):
+        raise ValueError("Queries with CYPHER options are not supported.")
+    if not cypher_query:
+        raise ValueError("The query is empty.")
+    return cypher_query
+
+# Number of nodes sampled when profiling the attributes of a label
+PROFILE_SAMPLE_SIZE = 1000
+# Number of example values kept for each attribute
+PROFILE_EXAMPLE_COUNT = 3
+
+# Build one query returning the count of every label or relationship type, answered from the count store
+def union_count_query(patterns):
+    parts = [f"MATCH {pattern} RETURN $name_{i} AS name, count(*) AS count" for i, pattern in enumerate(patterns)]
+    return " UNION ALL ".join(parts)
+
+# Count the nodes of every label in a single query
+def count_labels(tx, labels):
+    if not labels:
+        return {}
+    cypher = union_count_query([f"(n:`{label}`)" for label in labels])
+    result = tx.run(cypher, {f"name_{i}": label for i, label in enumerate(labels)})
+    return {record["name"]: int(record["count"]) for record in result}
+
+# Count the relationships of every type in a single query
+def count_relationship_types(tx, types):
+    if not types:
+        return {}
+    cypher = union_count_query([f"()-[r:`{rel_type}`]->()" for rel_type in types])
+    result = tx.run(cypher, {f"name_{i}": rel_type for i, rel_type in enumerate(types)})
+    return {record["name"]: int(record["count"]) for record in result}
+
+# Neo4j schema property types mapped to the type names used in LangChain graph schemas
+PROPERTY_TYPE_NAMES = {
+    "String": "STRING",
+    "Long": "INTEGER",
+    "Double": "FLOAT",
+    "Boolean": "BOOLEAN",
+    "Date": "DATE",
+    "DateTime": "DATE_TIME",
+    "LocalDateTime": "LOCAL_DATE_TIME",
+    "LocalTime": "LOCAL_TIME",
+    "Time": "TIME",
+    "Duration": "DURATION",
+    "Point": "POINT",
+}
+
+def property_type_name(property_types):
+    if not property_types:
+        return "STRING"
+    # Properties holding several types are reported with the first one
+    property_type = property_types[0]
+    if property_type.endswith("Array"):
+        return "LIST"
+    return PROPERTY_TYPE_NAMES.get(property_type, property_type.upper())
+
+# Build the ontology view elements from label counts and (start, type, end) relationships
+def build_ontology_elements(label_counts, relationships):
+    nodes = []
+    for label, count in label_counts.items():
+        val  = {}
+        val["id"] = label
+        val["instance count"] = count
+        val["caption"] = camel_snake_to_normal(label)
+        val["label"] = val["caption"]
+        nodes.append({"data": val})
+
+    edges = []
+    for relationship in relationships:
+        edges.append({"data": {"id": relationship["type"], "caption": camel_snake_to_normal(relationship["type"]), "label": camel_snake_to_normal(relationship["type"]), "source": relationship["start"], "target": relationship["end"]}})
+
+    elements = {"nodes": nodes, "edges": edges}
+    return elements
+
 class GeneralDAO:
 
     def __init__(self, driver):
@@ -33,28 +128,93 @@ class GeneralDAO:
             records = session.run(cypher_query)
         # records, _, _ = self.driver.execute_query(cypher_query)
             return records.to_df()
+    
+    # Run an untrusted (e.g. generated) read query with guards:
+    # - the query is planned with EXPLAIN first and rejected if its estimated rows exceed the budget
+    # - it runs in a read transaction with a timeout, in seconds
+    # - results are streamed with the given fetch size into a DataFrame capped at `max_rows`
+    # Returns the DataFrame and whether the cap truncated it
+    def run_guarded_query(self, cypher_query, max_estimated_rows=MAX_ESTIMATED_ROWS, timeout=QUERY_TIMEOUT, fetch_size=QUERY_FETCH_SIZE, max_rows=MAX_RESULT_ROWS):
+        cypher_query = normalize_guarded_query(cypher_query)
+        with self.driver.session(default_access_mode=neo4j.READ_ACCESS, fetch_size=fetch_size) as session:
+            plan = session.run(f"EXPLAIN {cypher_query}").consume().plan or {}
+            estimated_rows = plan.get("args", {}).get("EstimatedRows")
+            if estimated_rows is not None and estimated_rows > max_estimated_rows:
+                raise QueryBudgetExceeded(f"The query is estimated to return {int(estimated_rows)} rows, more than the limit of {max_estimated_rows}.")
+
+            with session.begin_transaction(timeout=timeout) as tx:
+                result = tx.run(cypher_query)
+                columns = result.keys()
+                rows = []
+                truncated = False
+                for record in result:
+                    if len(rows) == max_rows:
+                        truncated = True
+                        break
+                    rows.append(record.values())
+                # Leaving the transaction without a commit discards the rest of the stream
+            return pd.DataFrame(rows, columns=columns), truncated
         
+    # Fetch a cheap fingerprint of the graph content from per-label and per-relationship-type counts
+    # The fingerprint changes whenever nodes or relationships are loaded or removed
+    def get_graph_fingerprint(self):
+        def get_fingerprint(tx):
+            labels = [record["label"] for record in tx.run("CALL db.labels() YIELD label RETURN label")]
+            types = [record["relationshipType"] for record in tx.run("CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType")]
+            return {
+                "labels": count_labels(tx, labels),
+                "relationshipTypes": count_relationship_types(tx, types),
+            }
+
+        with self.driver.session() as session:
+            counts = session.execute_read(get_fingerprint)
+        payload = json.dumps(counts, sort_keys=True).encode("utf-8")
+        return hashlib.sha1(payload).hexdigest()
+
+    # Fetch the graph schema in one read transaction: labels with their instance counts,
+    # (start, type, end) relationships, relationship type counts and property types
+    def get_schema(self):
+        def get_schema(tx):
+            graph = tx.run("call db.schema.visualization()").graph()
+            look_up = {node.element_id: list(node.labels)[0] for node in graph.nodes}
+            labels = list(look_up.values())
+            relationships = [
+                {"start": look_up[edge.start_node.element_id], "type": edge.type, "end": look_up[edge.end_node.element_id]}
+                for edge in graph.relationships
+            ]
+            types = sorted({relationship["type"] for relationship in relationships})
+
+            node_properties = {label: [] for label in labels}
+            result = tx.run("CALL db.schema.nodeTypeProperties() YIELD nodeLabels, propertyName, propertyTypes RETURN nodeLabels, propertyName, propertyTypes")
+            for record in result:
+                if record["propertyName"] is None:
+                    continue
+                for label in record["nodeLabels"]:
+                    node_properties.setdefault(label, []).append({"property": record["propertyName"], "type": property_type_name(record["propertyTypes"])})
+
+            relationship_properties = {}
+            result = tx.run("CALL db.schema.relTypeProperties() YIELD relType, propertyName, propertyTypes RETURN relType, propertyName, propertyTypes")
+            for record in result:
+                if record["propertyName"] is None:
+                    continue
+                rel_type = record["relType"].lstrip(":").strip("`")
+                relationship_properties.setdefault(rel_type, []).append({"property": record["propertyName"], "type": property_type_name(record["propertyTypes"])})
+
+            return {
+                "labels": count_labels(tx, labels),
+                "relationships": relationships,
+                "relationship_types": count_relationship_types(tx, types),
+                "node_properties": node_properties,
+                "relationship_properties": relationship_properties,
+            }
+
+        with self.driver.session() as session:
+            return session.execute_read(get_schema)
+
     # Fetch ontology data
     def get_ontology_data(self):
-        query = "call db.schema.visualization()"
-        result = self.driver.execute_query(query, result_transformer_=neo4j.Result.graph)
-        nodes = []
-        look_up = {}
-        for node in result.nodes:
-            val  = {}
-            val["id"] = list(node.labels)[0]
-            look_up[node.element_id] = val["id"]
-            val["instance count"] = self.get_sample_count(val["id"])
-            val["caption"] = camel_snake_to_normal(val["id"])
-            val["label"] = val["caption"]
-            nodes.append({"data": val})
-
-        edges = []
-        for edge in result.relationships:
-            edges.append({"data": {"id": edge.type, "caption": camel_snake_to_normal(edge.type), "label": camel_snake_to_normal(edge.type), "source": look_up[edge.start_node.element_id], "target": look_up[edge.end_node.element_id]}})
-
-        elements = {"nodes": nodes, "edges": edges}
-        return elements
+        schema = self.get_schema()
+        return build_ontology_elements(schema["labels"], schema["relationships"])
         
     # Fetch sample count of any input node type
     def get_sample_count(self, node_type):
@@ -73,6 +233,40 @@ class GeneralDAO:
                 return None
             return [str(record["example"]) for record in records]
         
+    # Profile all attributes of a node type from a bounded sample in a single query:
+    # property keys, example values and the share of sampled nodes missing the attribute
+    def get_label_profile(self, node_type, sample_size=PROFILE_SAMPLE_SIZE):
+        def get_profile(tx):
+            # NaN is the only value not equal to itself, `v = v` drops it along with nulls
+            cypher = f"""MATCH (n:`{node_type}`) WITH n LIMIT $sample_size
+                        WITH collect(n) AS nodes
+                        UNWIND nodes AS n
+                        WITH size(nodes) AS total, n
+                        UNWIND keys(n) AS key
+                        WITH total, key, [v IN collect(n[key]) WHERE v = v] AS values
+                        RETURN key, total, size(values) AS present, values[..$value_limit] AS values
+                        ORDER BY key"""
+            result = tx.run(cypher, sample_size=sample_size, value_limit=sample_size // 10 + PROFILE_EXAMPLE_COUNT)
+            profile = []
+            for record in result:
+                examples = []
+                for value in record["values"]:
+                    value = str(value)
+                    if value not in examples:
+                        examples.append(value)
+                    if len(examples) == PROFILE_EXAMPLE_COUNT:
+                        break
+                profile.append({
+                    "key": record["key"],
+                    "caption": camel_snake_to_normal(record["key"]),
+                    "examples": examples,
+                    "null_ratio": 1 - record["present"] / record["total"],
+                })
+            return profile
+
+        with self.driver.session() as session:
+            return session.execute_read(get_profile)
+
     # Fetch data attributes of any input node type
     def get_node_attributes(self, node_type):
         query = f"MATCH (n:{node_type}) WITH n LIMIT 1 UNWIND keys(n) as key RETURN key"
@@ -0,0 +1,44 @@
+# Helpers shared by the entity DAOs to list node keys and fetch property maps without shipping whole nodes
+
+# Get one page of key values of a node label, ordered by key
+# Paging is keyset based: pass the last key of the previous page as `after`
+def get_id_page(driver, label, key, after=None, limit=None):
+    def get_ids(tx):
+        # a plain range predicate lets the planner seek the key index and skip the sort
+        condition = f"n.`{key}` > $after" if after is not None else f"n.`{key}` IS NOT NULL"
+        cypher = f"""MATCH (n:`{label}`)
+                    WHERE {condition}
+                    RETURN n.`{key}` AS id
+                    ORDER BY id ASC"""
+        if limit is not None:
+            cypher += " LIMIT $limit"
+        result = tx.run(cypher, after=after, limit=limit)
+        return [record["id"] for record in result]
+
+    with driver.session() as session:
+        return session.execute_read(get_ids)
+
+# Get the number of nodes of a label, answered from the count store
+def get_node_count(driver, label):
+    def get_count(tx):
+        cypher = f"MATCH (n:`{label}`) RETURN count(n) AS count"
+        return int(tx.run(cypher).single()["count"])
+
+    with driver.session() as session:
+        return session.execute_read(get_count)
+
+# Get the property map of the node of a label with a given key value, or an empty map if there is none
+def get_properties(driver, label, key, value):
+    return get_properties_batch(driver, label, key, [value]).get(value, {})
+
+# Get the property maps of many nodes of a label in one query, by key value
+def get_properties_batch(driver, label, key, values):
+    def get_properties(tx):
+        cypher = f"""UNWIND $values AS value
+                    MATCH (n:`{label}` {{`{key}`: value}})
+                    RETURN value, properties(n) AS properties"""
+        result = tx.run(cypher, values=list(values))
+        return {record["value"]: record["properties"] for record in result}
+
+    with driver.session() as session:
+        return session.execute_read(get_properties)
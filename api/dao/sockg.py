@@ -1,11 +1,13 @@
 from SPARQLWrapper import SPARQLWrapper, JSON
 import collections
+from api.catalog import get_catalog
 
 # SOCKG knowledge graph class
 class SOCKG:
     def __init__(self, sparql_endpoint):
         
         # Initialize the SPARQLWrapper with the endpoint URL
+        self.sparql_endpoint = sparql_endpoint
         self.sparql = SPARQLWrapper(sparql_endpoint)
         self.sparql.setReturnFormat(JSON)
         self.adjacency_list = collections.defaultdict(list)
@@ -29,10 +31,31 @@ class SOCKG:
         - self.class_reference_link: A dictionary where the key is a class (node type) and the value is the reference USDA link for that node type.
         - self.classes: A set of all node types in the knowledge graph.
         - self.object_properties: A set of all relations in the knowledge graph.
+        The SPARQL rows are persisted in the schema catalog, so the query only runs the first time an endpoint is seen.
 
         :param: None
         :return: None
         '''
+        try:
+            rows = get_catalog().get_sparql_ontology(self.sparql_endpoint, self._fetch_ontology_rows)
+        except Exception as e:
+            print(f"Error reading schema catalog: {e}")
+            rows = self._fetch_ontology_rows()
+
+        for start_node_type, relation, end_node_type, start_reference_link, end_reference_link in rows:
+            self.adjacency_list[start_node_type].append((relation, end_node_type))
+            self.class_reference_link[start_node_type] = start_reference_link
+            self.class_reference_link[end_node_type] = end_reference_link
+            self.classes.add(start_node_type)
+            self.classes.add(end_node_type)
+            self.object_properties.add(relation)
+
+    def _fetch_ontology_rows(self):
+        '''
+        Run the SPARQL query returning the object properties of the ontology.
+        :param: None
+        :return: A list of [start node type, relation, end node type, start reference link, end reference link] rows
+        '''
         # Define the SPARQL query to get all classes/or nodes types
         get_ontology_query = """
             PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
@@ -63,21 +86,21 @@ class SOCKG:
         """
         
         # Run the query
+        rows = []
         try:
             self.sparql.setQuery(get_ontology_query)
             results = self.sparql.queryAndConvert()
             for result in results["results"]["bindings"]:
-                start_node_type = result["startNodeType"]["value"]
-                relation = result["relationType"]["value"]
-                end_node_type = result["endNodeType"]["value"]
-                self.adjacency_list[start_node_type].append((relation, end_node_type))
-                self.class_reference_link[start_node_type] = result["start_reference_link"]["value"]
-                self.class_reference_link[end_node_type] = result["end_reference_link"]["value"]
-                self.classes.add(start_node_type)
-                self.classes.add(end_node_type)
-                self.object_properties.add(relation)
+                rows.append([
+                    result["startNodeType"]["value"],
+                    result["relationType"]["value"],
+                    result["endNodeType"]["value"],
+                    result["start_reference_link"]["value"],
+                    result["end_reference_link"]["value"],
+                ])
         except Exception as e:
             print(f"Error retrieving knownledge graph schema: {e}")
+        return rows
 
     def get_all_classes(self):
         """
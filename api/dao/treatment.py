@@ -1,25 +1,27 @@
 import pandas as pd
-import re
+from api.frames import materialize, to_categorical
 
-def extract_numeric_value(descriptor):
-    descriptor = str(descriptor)
+# Nitrogen descriptors meaning no nitrogen was applied, might need more
+ZERO_NITROGEN_PHRASES = ['none', 'none applied', 'check', 'no nitrogen', 'zero nitrogen fertilizer (zn)']
 
-    # Remove leading/trailing whitespace
-    descriptor = descriptor.strip()
-    
-    # Check for non-numeric descriptors indicating zero, might need more
-    if descriptor.lower() in ['none', 'none applied', 'check', 'no nitrogen', 'zero nitrogen fertilizer (zn)']:
-        return 0
-    
-    # Extract all numeric values
-    numbers = re.findall(r'\d+(?:\.\d+)?', descriptor)
+# Descriptor columns with few distinct values are stored as categoricals
+CATEGORICAL_COLUMNS = ['coverCrop', 'residueRemoval', 'fertilizerAmendmentClass', 'organicManagement', 'irrigation', 'nitrogenTreatmentDescriptor']
 
-    if numbers:
-        # If there are multiple numbers, return the first one
-        return float(numbers[0])
-    
-    # If we can't determine a numeric value, return 'unavailable'
-    return None
+# Declared dtypes of the treatment columns, the descriptors with few distinct values are categoricals
+TREATMENT_SCHEMA = {
+    'treatmentId': 'string',
+    'coverCrop': 'category',
+    'residueRemoval': 'category',
+    'fertilizerAmendmentClass': 'category',
+    'nitrogenTreatmentDescriptor': 'category',
+}
+
+# Extract the nitrogen amount of every descriptor at once: the first number in the descriptor,
+# zero for the phrases meaning no nitrogen, and missing when neither applies
+def extract_numeric_values(descriptors):
+    descriptors = descriptors.astype('string').str.strip()
+    numbers = descriptors.str.extract(r'(\d+(?:\.\d+)?)', expand=False).astype('float64')
+    return numbers.mask(descriptors.str.lower().isin(ZERO_NITROGEN_PHRASES).fillna(False).astype(bool), 0.0)
 
 class TreatmentDAO:
     def __init__(self, driver):
@@ -98,25 +100,20 @@ class TreatmentDAO:
         def get_treatments(tx):
             cypher = """
             MATCH (t:Treatment)-[:hasRotation]-(r:Rotation)
-                RETURN apoc.map.fromPairs([key IN keys(t) | [key, t[key]]]) AS properties, r.rotationDescriptor as rotation_crop
+                RETURN properties(t) AS properties, r.rotationDescriptor AS coverCrop
             """
             result = tx.run(cypher)
-            data = []
-            for record in result:
-                record['properties']['coverCrop'] = record['rotation_crop']
-                data.append(record['properties'])
-            dataframe = pd.DataFrame(data)
-            
-            # Convert all nan and None values to 'unknown'
-            dataframe.fillna('unknown', inplace=True)
+            # the rotation descriptor replaces any coverCrop property of the treatment
+            dataframe = materialize(result, schema=TREATMENT_SCHEMA, properties="properties")
 
-            # Add numeric values for nitrogen treatment
-            dataframe['numericNitrogen'] = dataframe['nitrogenTreatmentDescriptor'].apply(extract_numeric_value)
+            # Add numeric values for nitrogen treatment, missing descriptors have no value
+            dataframe['numericNitrogen'] = extract_numeric_values(dataframe['nitrogenTreatmentDescriptor'])
 
-            # remove columns that are all 'unknown'
-            dataframe = dataframe.loc[:, (dataframe != 'unknown').any(axis=0)]
+            # remove columns that are all missing
+            dataframe = dataframe.dropna(axis=1, how='all')
 
-            return dataframe
+            # store the repeated descriptor strings once per distinct value
+            return to_categorical(dataframe, CATEGORICAL_COLUMNS)
         
         with self.driver.session() as session:
             return session.execute_read(get_treatments)
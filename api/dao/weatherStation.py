@@ -1,52 +1,84 @@
-import pandas as pd
+import threading
+from api.cache import get_graph_fingerprint
+from api.frames import materialize, property_dtype
+from api.dao.nodes import get_id_page, get_node_count, get_properties, get_properties_batch
+
+# Observation property holding the ISO date string
+DATE_PROPERTY = "date"
+
+# Convert a date, datetime or timestamp to the ISO date string stored on observations
+def to_date_string(value):
+    if value is None or isinstance(value, str):
+        return value
+    return value.strftime("%Y-%m-%d")
+
+# Non-empty observation properties of each weather station, with the graph fingerprint they were read at
+_observation_properties = {}
+_observation_properties_lock = threading.Lock()
+
 class weatherStationDAO:
     def __init__(self, driver):
         self.driver = driver
     
-    # get the unique ID of all experimental units
-    def get_all_ids(self):
-
-        def get_weather_station_id(tx):
-            cypher = "MATCH (w:WeatherStation) return w as weather_stations"
-            result = tx.run(cypher)
-            return [record["weather_stations"]["weatherStationId"] for record in result]
-        
-        with self.driver.session() as session:
-            return session.execute_read(get_weather_station_id)
+    # get the unique ID of all weather stations, optionally one page after a given ID
+    def get_all_ids(self, after=None, limit=None):
+        return get_id_page(self.driver, "WeatherStation", "weatherStationId", after=after, limit=limit)
+    
+    # get the total number of weather stations
+    def get_id_count(self):
+        return get_node_count(self.driver, "WeatherStation")
 
     
-    # get all relevant information of a weather station
+    # get the property map of a weather station
     def get_weather_station_info(self, weatherStation_id):
-    
-        def get_weather_station_info(tx):
-                cypher = """MATCH (u:WeatherStation {weatherStationId: $weatherStation_id})
-                            WITH u, keys(u) AS keys
-                            UNWIND keys AS key
-                            RETURN key, apoc.map.get(u, key) AS property"""
-                result = tx.run(cypher, weatherStation_id=weatherStation_id)
-                return result.to_df()
-            
-        with self.driver.session() as session:
-            return session.execute_read(get_weather_station_info)
-    
-    # get number of weather observations of a weather station
-    def get_weather_observation(self, weatherStation_id):
-        
-        def get_weather_observation(tx):
+        return get_properties(self.driver, "WeatherStation", "weatherStationId", weatherStation_id)
+
+    # get the property maps of many weather stations in one query, by ID
+    def get_weather_station_infos(self, weatherStation_ids):
+        return get_properties_batch(self.driver, "WeatherStation", "weatherStationId", weatherStation_ids)
+
+    # get the properties of a weather station's observations that hold a value other than null or zero.
+    # Finding them scans every observation, so they are read once per station and graph fingerprint.
+    def get_observation_properties(self, weatherStation_id):
+        fingerprint = get_graph_fingerprint()
+        with _observation_properties_lock:
+            cached = _observation_properties.get(weatherStation_id)
+        if cached is not None and cached[0] == fingerprint:
+            return list(cached[1])
+
+        def get_observation_properties(tx):
             cypher = """MATCH (w:WeatherStation {weatherStationId: $weatherStation_id})-[:weatherRecordedBy]->(o:WeatherObservation)
-                        RETURN apoc.map.fromPairs([key IN keys(o) | [key, o[key]]]) AS properties"""
+                        UNWIND keys(o) AS key
+                        WITH key, o[key] AS value
+                        WHERE value IS NOT NULL AND value <> 0
+                        RETURN DISTINCT key
+                        ORDER BY key"""
             result = tx.run(cypher, weatherStation_id=weatherStation_id)
-            data = [record["properties"] for record in result]
-            dataframe = pd.DataFrame(data)
-            # drop columns with all null values
-            dataframe = dataframe.dropna(axis=1, how='all')
-            # # drop columns with all zero values
-            dataframe = dataframe.loc[:, (dataframe != 0).any(axis=0)]
-            # drop rows with all null values
-            dataframe = dataframe.dropna(axis=0, how='all')
-            # fill null values with 'Not Available'
-            dataframe = dataframe.fillna('Not Available')
-            return dataframe
+            return [record["key"] for record in result]
+
+        with self.driver.session() as session:
+            properties = session.execute_read(get_observation_properties)
+        with _observation_properties_lock:
+            _observation_properties[weatherStation_id] = (fingerprint, properties)
+        return list(properties)
+
+    # get the weather observations of a weather station between two dates (both included, either optional),
+    # ordered by date. Only the non-empty properties are fetched, limited to `columns` if given.
+    def get_weather_observation(self, weatherStation_id, start=None, end=None, columns=None):
+        properties = self.get_observation_properties(weatherStation_id)
+        if columns is not None:
+            properties = [key for key in properties if key in columns]
+        # the date is always returned first
+        properties = [DATE_PROPERTY] + [key for key in properties if key != DATE_PROPERTY]
+
+        def get_weather_observation(tx):
+            projection = ", ".join(f"o[$properties[{i}]] AS `{key.replace('`', '``')}`" for i, key in enumerate(properties))
+            cypher = f"""MATCH (w:WeatherStation {{weatherStationId: $weatherStation_id}})-[:weatherRecordedBy]->(o:WeatherObservation)
+                        WHERE ($start IS NULL OR o.date >= $start) AND ($end IS NULL OR o.date <= $end)
+                        RETURN {projection}
+                        ORDER BY o.date ASC"""
+            result = tx.run(cypher, weatherStation_id=weatherStation_id, properties=properties, start=to_date_string(start), end=to_date_string(end))
+            return materialize(result, schema=property_dtype)
 
         with self.driver.session() as session:
             return session.execute_read(get_weather_observation)
@@ -0,0 +1,38 @@
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from api.neo4j import get_setting
+
+# Default number of queries run at the same time, can be overridden in the streamlit secrets.toml file
+DEFAULT_QUERY_WORKERS = 8
+
+# The process-wide pool running independent reads, sharing the driver's connection pool
+_executor = None
+_executor_lock = threading.Lock()
+
+# Get the shared query executor, created on first use
+def get_executor():
+    global _executor
+    if _executor is not None:
+        return _executor
+
+    with _executor_lock:
+        if _executor is None:
+            workers = int(get_setting("QUERY_WORKERS", DEFAULT_QUERY_WORKERS))
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="query")
+    return _executor
+
+# Run a read in the background and return its future, so independent reads of a page
+# run concurrently and the page waits on each result only where it renders it
+def submit(function, *args, **kwargs):
+    return get_executor().submit(function, *args, **kwargs)
+
+# Stop the shared query executor
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+atexit.register(shutdown_executor)
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+# Label of the facet option matching missing values
+UNKNOWN = 'unknown'
+
+# Bitmaps over the rows of a read-only DataFrame for cascading filters.
+# Every facet column is encoded once into integer codes of its sorted values, every value has a boolean
+# row mask, missing values are offered as UNKNOWN, and one numeric column is kept sorted for range filters.
+# Filtering is a few bitwise ANDs and a binary search, option lists and counts are bincounts of the codes.
+#
+# `levels` names facet columns forming a hierarchy, from parent to child (e.g. state, county, site);
+# the values under each parent value are precomputed to drop selections a new parent no longer contains.
+class FacetIndex:
+
+    def __init__(self, dataframe, columns, range_column=None, levels=None):
+        self.size = len(dataframe)
+        self.columns = list(columns)
+        self.codes = {}
+        self.values = {}
+        self.bitmaps = {}
+        for column in self.columns:
+            codes, values = pd.factorize(dataframe[column], sort=True)
+            self.codes[column] = codes
+            self.values[column] = values.tolist()
+            bitmaps = {value: codes == code for code, value in enumerate(self.values[column])}
+            if (codes == -1).any():
+                bitmaps[UNKNOWN] = codes == -1
+            self.bitmaps[column] = bitmaps
+
+        self.levels = list(levels or [])
+        self.hierarchy = {}
+        for depth, child in enumerate(self.levels):
+            for parent in self.levels[:depth]:
+                self.hierarchy[(parent, child)] = self._children(parent, child)
+
+        self.range_column = range_column
+        if range_column is not None:
+            values = dataframe[range_column].to_numpy(dtype="float64", na_value=np.nan)
+            # missing values sort last and never fall in a range
+            self._order = np.argsort(values, kind="stable")
+            self._sorted = values[self._order]
+            present = self._sorted[~np.isnan(self._sorted)]
+            self.range = (present[0], present[-1]) if present.size else (np.nan, np.nan)
+
+    # Values of the child column found under each value of the parent column
+    def _children(self, parent, child):
+        parent_codes, child_codes = self.codes[parent], self.codes[child]
+        present = (parent_codes >= 0) & (child_codes >= 0)
+        pairs = np.unique(parent_codes[present].astype(np.int64) * len(self.values[child]) + child_codes[present])
+        children = {}
+        for parent_code, child_code in zip(pairs // len(self.values[child]), pairs % len(self.values[child])):
+            children.setdefault(self.values[parent][parent_code], set()).add(self.values[child][child_code])
+        return children
+
+    # Drop the level selections that are not found under a selected parent, e.g. a county of another state
+    def prune(self, filters):
+        filters = dict(filters)
+        for depth, child in enumerate(self.levels):
+            value = filters.get(child)
+            if not value or value == UNKNOWN:
+                continue
+            for parent in self.levels[:depth]:
+                parent_value = filters.get(parent)
+                if parent_value and parent_value != UNKNOWN and value not in self.hierarchy[(parent, child)].get(parent_value, ()):
+                    filters[child] = None
+                    break
+        return filters
+
+    # Number of matching rows of each value of a column, missing values are counted as UNKNOWN
+    def counts(self, column, mask):
+        counts = np.bincount(self.codes[column][mask] + 1, minlength=len(self.values[column]) + 1)
+        result = {value: int(count) for value, count in zip(self.values[column], counts[1:]) if count}
+        if counts[0]:
+            result[UNKNOWN] = int(counts[0])
+        return result
+
+    # Row mask of the values between `low` and `high`, both included, of the range column
+    def range_mask(self, low, high):
+        first = np.searchsorted(self._sorted, low, side="left")
+        last = np.searchsorted(self._sorted, high, side="right")
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self._order[first:last]] = True
+        return mask
+
+    # Row mask of the rows matching every active filter. `filters` maps facet columns to the selected
+    # value (falsy means no filter) and the range column to a (low, high) tuple.
+    def mask(self, filters):
+        mask = np.ones(self.size, dtype=bool)
+        for column, value in filters.items():
+            if column == self.range_column and value is not None:
+                mask &= self.range_mask(*value)
+            elif column in self.bitmaps and value:
+                bitmap = self.bitmaps[column].get(value)
+                if bitmap is None:
+                    return np.zeros(self.size, dtype=bool)
+                mask &= bitmap
+        return mask
+
+    # Get the row mask of the active filters and, for every facet, the options left in the matching rows:
+    # the sorted values, followed by UNKNOWN when missing values remain
+    def query(self, filters):
+        mask = self.mask(filters)
+        options = {}
+        for column in self.columns:
+            options[column] = list(self.counts(column, mask))
+        return mask, options
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+# Convert the string columns among `columns` to categoricals, so repeated values are stored once.
+# Columns that are missing or hold non-string values are left as they are.
+def to_categorical(dataframe, columns):
+    dataframe = dataframe.copy()
+    for column in columns:
+        if column in dataframe.columns and dataframe[column].dtype == object:
+            dataframe[column] = dataframe[column].astype("category")
+    return dataframe
+
+# Cast a column of raw values to a declared dtype
+def _to_array(values, dtype):
+    if dtype == "float64":
+        # numpy converts None to NaN
+        return np.array(values, dtype="float64")
+    if dtype in ("Int64", "boolean", "string"):
+        return pd.array(values, dtype=dtype)
+    if dtype == "category":
+        # an object array skips inferring the values again from a list
+        return pd.Categorical(np.array(values, dtype=object))
+    if dtype.startswith("datetime64"):
+        values = [value.to_native() if hasattr(value, "to_native") else value for value in values]
+        try:
+            # SOCKG stores dates as ISO strings, parsing with an explicit format is much faster
+            dates = pd.to_datetime(values, format="%Y-%m-%d")
+        except (ValueError, TypeError):
+            dates = pd.to_datetime(values, errors="coerce")
+            # A value that is not a date raises, so materialize infers the column instead of losing it
+            if dates.isna().sum() > sum(value is None for value in values):
+                raise ValueError("column holds values that are not dates")
+        return dates.values
+    return pd.array(values, dtype=dtype)
+
+# Declared dtype of a SOCKG node property from its naming conventions, usable as a materialize schema:
+# IDs (e.g. expUnitId) are categories, dates (e.g. soilBiolDate) are datetimes and measurements, named
+# with a unit suffix (e.g. precipitation_mm_per_d), are floats. Other properties are inferred.
+def property_dtype(key):
+    if key.endswith("Id") or key.endswith("ID"):
+        return "category"
+    if key == "date" or key.endswith("Date"):
+        return "datetime64[ns]"
+    if "_" in key:
+        return "float64"
+    return None
+
+# Infer the dtype of an undeclared column from the Python types of its values, or None to keep them as objects:
+# - booleans become `boolean`, integers `Int64` and other numbers `float64`
+# - Neo4j temporal values and ISO date strings in columns named like a date become `datetime64`
+# Columns with mixed or other values are left as they are.
+def _infer_dtype(key, values):
+    kinds = set(map(type, values))
+    kinds.discard(type(None))
+    if not kinds:
+        return None
+    if kinds == {bool}:
+        return "boolean"
+    if kinds == {int}:
+        return "Int64"
+    if kinds <= {int, float}:
+        return "float64"
+    if all(hasattr(kind, "to_native") for kind in kinds):
+        return "datetime64[ns]"
+    if kinds == {str} and "date" in str(key).lower():
+        return "date string"
+    return None
+
+# Cast a column of raw values to its inferred dtype
+def _to_inferred_array(key, values):
+    dtype = _infer_dtype(key, values)
+    if dtype == "date string":
+        try:
+            # Only convert when every string is a date, so free-text columns keep their values
+            return pd.to_datetime(values, format="%Y-%m-%d").values
+        except (ValueError, TypeError):
+            dtype = None
+    if dtype is None:
+        return pd.array(values, dtype=object)
+    return _to_array(values, dtype)
+
+# Consume a Bolt result straight into per-column arrays and return a DataFrame.
+# - `schema` maps column names to declared dtypes ("float64", "Int64", "boolean", "string",
+#   "category", "datetime64[ns]"), or is a function of the column name such as property_dtype;
+#   undeclared columns, and declared ones whose values do not fit, are inferred from their values
+#   with _infer_dtype, which costs a pass over each column
+# - `properties` names a column holding property maps, which is spread into one column per key
+#   (keys missing from a map become NA) instead of a list of dicts; returned columns take
+#   precedence over map keys of the same name
+def materialize(result, schema=None, properties=None):
+    declared = schema if callable(schema) else (schema or {}).get
+    keys = list(result.keys())
+    records = list(result)
+
+    # Records are tuples, transposing their plain tuple iterators gives one tuple of values per column
+    columns = dict(zip(keys, zip(*map(tuple.__iter__, records)))) if records else {key: () for key in keys}
+
+    if properties is not None:
+        maps = columns.pop(properties)
+        returned = set(columns)
+        for row, properties_map in enumerate(maps):
+            for key, value in (properties_map or {}).items():
+                if key in returned:
+                    continue
+                column = columns.get(key)
+                if column is None:
+                    # Rows without the key keep None
+                    column = columns[key] = [None] * len(records)
+                column[row] = value
+
+    data = {}
+    for key, values in columns.items():
+        values, dtype = list(values), declared(key)
+        try:
+            data[key] = _to_array(values, dtype) if dtype else _to_inferred_array(key, values)
+        except (ValueError, TypeError):
+            data[key] = _to_inferred_array(key, values)
+    return pd.DataFrame(data, columns=list(data.keys()))
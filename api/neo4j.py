@@ -1,23 +1,64 @@
 from neo4j import GraphDatabase
 import streamlit as st
+import threading
+import atexit
+
+# Default connection pool settings, each can be overridden in the streamlit secrets.toml file
+DEFAULT_MAX_POOL_SIZE = 50
+DEFAULT_ACQUISITION_TIMEOUT = 30.0
+DEFAULT_MAX_CONNECTION_LIFETIME = 3600.0
+
+# The process-wide driver shared by every session, page and DAO
+_driver = None
+_driver_lock = threading.Lock()
+
+# Read an optional setting from the streamlit secrets.toml file
+def get_setting(key, default):
+    try:
+        return st.secrets.get(key, default)
+    except FileNotFoundError:
+        return default
 
 # Initialize the Neo4j driver from environment variables
-def init_driver():
-    # Get the secrets from the streamlit secrets.toml file
-    uri = st.secrets["NEO4J_URI"]
-    user = st.secrets["NEO4J_USERNAME"]
-    password = st.secrets["NEO4J_PASSWORD"]
-
-    driver =  GraphDatabase.driver(uri, auth=(user, password))
-    
-    # Verify the connection    
-    driver.verify_connectivity()
-    return driver
+def init_driver(uri=None, user=None, password=None):
+    global _driver
+
+    # Reuse the pooled driver once it has been created
+    if _driver is not None:
+        return _driver
+
+    with _driver_lock:
+        if _driver is None:
+            # Get the secrets from the streamlit secrets.toml file
+            uri = uri or st.secrets["NEO4J_URI"]
+            user = user or st.secrets["NEO4J_USERNAME"]
+            password = password or st.secrets["NEO4J_PASSWORD"]
+
+            driver = GraphDatabase.driver(
+                uri,
+                auth=(user, password),
+                max_connection_pool_size=int(get_setting("NEO4J_MAX_POOL_SIZE", DEFAULT_MAX_POOL_SIZE)),
+                connection_acquisition_timeout=float(get_setting("NEO4J_ACQUISITION_TIMEOUT", DEFAULT_ACQUISITION_TIMEOUT)),
+                max_connection_lifetime=float(get_setting("NEO4J_MAX_CONNECTION_LIFETIME", DEFAULT_MAX_CONNECTION_LIFETIME)),
+            )
+
+            # Verify the connection once, when the pool is created
+            driver.verify_connectivity()
+            _driver = driver
+    return _driver
 
 # Close the Neo4j driver
-def close_driver(driver):
+def close_driver(driver=None):
+    global _driver
+    driver = driver or _driver
     if driver is not None:
         driver.close()
+        # Forget the shared driver so the next init_driver call builds a new pool
+        if driver is _driver:
+            _driver = None
         return True
     else:
         return False
+
+# Close the shared driver cleanly when the server process exits
+atexit.register(close_driver)
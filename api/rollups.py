@@ -0,0 +1,95 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from api.cache import SharedTable
+
+# Granularities of the rollups, from finest to coarsest
+GRANULARITIES = ["Daily", "Monthly", "Quarterly", "Yearly"]
+
+# Column holding the observation date
+DATE_COLUMN = "date"
+
+# Column holding the period of a rollup row
+PERIOD_COLUMN = "Period"
+
+# Weather variables that are summed over a period, every other variable is averaged
+def is_summed(column):
+    return "precipitation" in column.lower()
+
+# Label of each period key of a granularity: days, months, quarters and years since 1970
+def _period_labels(keys, granularity):
+    if granularity == "Daily":
+        return np.datetime_as_string(keys.astype("datetime64[D]"), unit="D")
+    if granularity == "Monthly":
+        return np.datetime_as_string(keys.astype("datetime64[M]"), unit="M")
+    if granularity == "Quarterly":
+        return [f"{1970 + key // 4}-Q{key % 4 + 1}" for key in keys]
+    return [str(1970 + key) for key in keys]
+
+# Parent key of each key of a granularity at the next coarser granularity
+def _parent_keys(keys, granularity):
+    if granularity == "Daily":
+        return keys.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    # months to quarters and quarters to years
+    return keys // 3 if granularity == "Monthly" else keys // 4
+
+# Aggregate the sums and counts of each column to the unique keys
+def _aggregate(keys, sums, counts):
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    size = len(unique_keys)
+    sums = np.column_stack([np.bincount(inverse, weights=column, minlength=size) for column in sums.T]) if sums.shape[1] else np.empty((size, 0))
+    counts = np.column_stack([np.bincount(inverse, weights=column, minlength=size) for column in counts.T]) if counts.shape[1] else np.empty((size, 0))
+    return unique_keys, sums, counts
+
+# Roll daily weather observations up to every granularity in one pass.
+# Each level is aggregated from the sums and counts of the level below it, so the observations
+# are only grouped once. Precipitation is summed, every other numeric variable is averaged.
+# Returns a DataFrame per granularity with a `Period` column followed by the variables.
+def compute_rollups(daily):
+    empty = {granularity: pd.DataFrame(columns=[PERIOD_COLUMN]) for granularity in GRANULARITIES}
+    if daily is None or daily.empty or DATE_COLUMN not in daily.columns:
+        return empty
+
+    variables = [column for column in daily.columns if column != DATE_COLUMN and pd.api.types.is_numeric_dtype(daily[column]) and not pd.api.types.is_bool_dtype(daily[column])]
+    if not variables:
+        return empty
+    dates = pd.to_datetime(daily[DATE_COLUMN], errors="coerce")
+    valid = dates.notna().to_numpy()
+    values = daily.loc[valid, variables].astype("float64").to_numpy().reshape(-1, len(variables))
+    summed = np.array([is_summed(column) for column in variables], dtype=bool)
+
+    present = ~np.isnan(values)
+    keys = dates[valid].to_numpy().astype("datetime64[D]").astype(np.int64)
+    sums, counts = np.where(present, values, 0.0), present.astype("float64")
+
+    rollups = {}
+    for granularity in GRANULARITIES:
+        keys, sums, counts = _aggregate(keys, sums, counts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = np.where(summed, sums, sums / counts)
+        result[counts == 0] = np.nan
+        frame = pd.DataFrame(np.round(result, 3), columns=variables)
+        frame.insert(0, PERIOD_COLUMN, _period_labels(keys, granularity))
+        rollups[granularity] = frame
+        if granularity != GRANULARITIES[-1]:
+            keys = _parent_keys(keys, granularity)
+    return rollups
+
+# Number of fields and stations whose rollups are kept, the least recently used are dropped
+MAX_CACHED_ROLLUPS = 64
+
+# Rollup tables of the process, by name, in least recently used order
+_rollups = OrderedDict()
+_rollups_lock = threading.Lock()
+
+# Get the rollups of a field or station, computed once per graph fingerprint from `load_daily()`
+def get_rollups(name, load_daily):
+    with _rollups_lock:
+        table = _rollups.get(name)
+        if table is None:
+            table = _rollups[name] = SharedTable(f"rollups:{name}", lambda: compute_rollups(load_daily()))
+            while len(_rollups) > MAX_CACHED_ROLLUPS:
+                _rollups.popitem(last=False)
+        _rollups.move_to_end(name)
+    return table.get()
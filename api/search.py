@@ -0,0 +1,53 @@
+import bisect
+import pandas as pd
+from api.cache import shared_table
+
+# Number of matches returned to an ID picker
+DEFAULT_SEARCH_LIMIT = 20
+
+# In-process prefix/substring index over a list of entity IDs
+class IdIndex:
+
+    def __init__(self, ids):
+        # Sorted lower case keys allow prefix lookups with a binary search
+        entries = sorted((str(id_).lower(), id_) for id_ in ids)
+        self.keys = [key for key, _ in entries]
+        self.ids = [id_ for _, id_ in entries]
+
+    def __len__(self):
+        return len(self.ids)
+
+    # Return at most `limit` IDs matching the query, prefix matches first, then substring matches
+    def search(self, query, limit=DEFAULT_SEARCH_LIMIT):
+        query = (query or "").strip().lower()
+        if not query:
+            return self.ids[:limit]
+
+        matches = []
+        start = bisect.bisect_left(self.keys, query)
+        end = start
+        while end < len(self.keys) and self.keys[end].startswith(query):
+            if len(matches) < limit:
+                matches.append(self.ids[end])
+            end += 1
+
+        # Fall back to substring matches outside the prefix range
+        for position, key in enumerate(self.keys):
+            if len(matches) >= limit:
+                break
+            if start <= position < end:
+                continue
+            if query in key:
+                matches.append(self.ids[position])
+        return matches
+
+# Get the index of an entity shared by every session, building it from `load_ids` on first use
+# and again after the graph changes
+def get_id_index(name, load_ids):
+    return shared_table(
+        f"id_index:{name}",
+        lambda: IdIndex(load_ids()),
+        snapshot=True,
+        encode=lambda index: pd.DataFrame({"id": index.ids}),
+        decode=lambda frame: IdIndex(frame["id"].tolist()),
+    ).get()
@@ -0,0 +1,58 @@
+import os
+import math
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Directory holding the on-disk snapshots of the shared reference tables
+SNAPSHOT_DIR = "snapshots"
+
+# Parquet schema metadata key holding the graph fingerprint a snapshot was built from
+FINGERPRINT_KEY = b"sockg_fingerprint"
+
+def _snapshot_path(name):
+    return os.path.join(SNAPSHOT_DIR, f"{name.replace(':', '_')}.parquet")
+
+# Stringify values of mixed-type columns that Arrow cannot store as one type
+def _stringify(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return str(value)
+
+# Convert a DataFrame to an Arrow table, stringifying mixed-type columns if needed
+def to_arrow(frame):
+    try:
+        return pa.Table.from_pandas(frame, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        frame = frame.copy()
+        for column in frame.columns[frame.dtypes == object]:
+            frame[column] = frame[column].map(_stringify)
+        return pa.Table.from_pandas(frame, preserve_index=False)
+
+# Write a DataFrame snapshot tagged with the graph fingerprint
+def write_snapshot(name, frame, fingerprint):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    table = to_arrow(frame)
+    metadata = dict(table.schema.metadata or {})
+    metadata[FINGERPRINT_KEY] = (fingerprint or "").encode("utf-8")
+    table = table.replace_schema_metadata(metadata)
+
+    # Write to a temporary file first so readers never see a partial snapshot
+    path = _snapshot_path(name)
+    temporary_path = path + ".tmp"
+    pq.write_table(table, temporary_path)
+    os.replace(temporary_path, path)
+
+# Read a DataFrame snapshot and the fingerprint it was built from, or (None, None) if there is none
+def read_snapshot(name):
+    path = _snapshot_path(name)
+    if not os.path.exists(path):
+        return None, None
+    try:
+        table = pq.read_table(path, memory_map=True)
+    except Exception as e:
+        print(f"Error reading snapshot {path}: {e}")
+        return None, None
+    fingerprint = (table.schema.metadata or {}).get(FINGERPRINT_KEY, b"").decode("utf-8") or None
+    return table.to_pandas(), fingerprint
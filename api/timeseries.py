@@ -0,0 +1,167 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from api.cache import get_graph_fingerprint
+from api.snapshot import SNAPSHOT_DIR, FINGERPRINT_KEY, to_arrow
+
+# Directory holding one Arrow file of observations per station
+TIMESERIES_DIR = os.path.join(SNAPSHOT_DIR, "timeseries")
+
+# Column holding the observation date
+DATE_COLUMN = "date"
+
+def _series_path(name):
+    return os.path.join(TIMESERIES_DIR, f"{name.replace(':', '_')}.arrow")
+
+# Columns holding at least one value that is not missing or zero
+def _non_empty_columns(table):
+    columns = []
+    for name in table.column_names:
+        column = table.column(name)
+        if column.null_count == len(column):
+            continue
+        if (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)) and not pc.any(pc.not_equal(column, 0)).as_py():
+            continue
+        columns.append(name)
+    return columns
+
+# Observations of one station kept in a memory-mapped Arrow file sorted by date.
+# The file is synced incrementally: only observations newer than the latest cached date are fetched,
+# and only after the graph fingerprint changed. Date ranges are sliced with a binary search on the dates.
+class TimeSeries:
+
+    def __init__(self, name, load):
+        self.name = name
+        self.load = load
+        self.table = None
+        self.dates = np.array([], dtype="datetime64[ns]")
+        self.columns = []
+        self._fingerprint = None
+        self._file_read = False
+        self._lock = threading.Lock()
+
+    @property
+    def empty(self):
+        return len(self.dates) == 0
+
+    @property
+    def min_date(self):
+        return pd.Timestamp(self.dates[0])
+
+    @property
+    def max_date(self):
+        return pd.Timestamp(self.dates[-1])
+
+    # Get the observations between two dates, both included, without the empty columns
+    def slice(self, start=None, end=None):
+        if self.table is None:
+            return pd.DataFrame()
+        first = 0 if start is None else np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start)), side="left")
+        last = len(self.dates) if end is None else np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end)), side="right")
+        return self.table.slice(first, last - first).select(self.columns).to_pandas()
+
+    # Bring the cached observations up to date with the graph
+    def sync(self):
+        fingerprint = get_graph_fingerprint()
+        if self.table is not None and self._fingerprint == fingerprint:
+            return self
+        with self._lock:
+            if not self._file_read:
+                self._file_read = True
+                self._read()
+            if self.table is None or self._fingerprint != fingerprint:
+                self._append(fingerprint)
+        return self
+
+    def _read(self):
+        path = _series_path(self.name)
+        if not os.path.exists(path):
+            return
+        try:
+            table = self._open()
+        except Exception as e:
+            print(f"Error reading time series {path}: {e}")
+            return
+        self._set_table(table, (table.schema.metadata or {}).get(FINGERPRINT_KEY, b"").decode("utf-8") or None)
+
+    def _append(self, fingerprint):
+        start = None if self.empty else self.max_date + pd.Timedelta(days=1)
+        new_rows = self.load(start)
+        if new_rows.empty:
+            self._fingerprint = fingerprint
+            return
+
+        frame = new_rows
+        if self.table is not None:
+            frame = pd.concat([self.table.to_pandas(), new_rows], ignore_index=True)
+        # assign a new column rather than writing into the loaded frame
+        frame = frame.assign(**{DATE_COLUMN: pd.to_datetime(frame[DATE_COLUMN], errors="coerce")})
+        frame = frame.dropna(subset=[DATE_COLUMN]).sort_values(DATE_COLUMN, kind="stable", ignore_index=True)
+        frame = frame[[DATE_COLUMN] + [column for column in frame.columns if column != DATE_COLUMN]]
+
+        table = to_arrow(frame)
+        metadata = dict(table.schema.metadata or {})
+        metadata[FINGERPRINT_KEY] = (fingerprint or "").encode("utf-8")
+        table = table.replace_schema_metadata(metadata)
+        try:
+            self._write(table)
+            # Serve the written file memory-mapped, so the merged table does not stay in memory
+            table = self._open()
+        except Exception as e:
+            print(f"Error writing time series {self.name}: {e}")
+        self._set_table(table, fingerprint)
+
+    # Open the station file memory-mapped: the columns reference the mapped file and nothing is
+    # copied until a slice is converted
+    def _open(self):
+        return pa.ipc.open_file(pa.memory_map(_series_path(self.name))).read_all()
+
+    def _write(self, table):
+        os.makedirs(TIMESERIES_DIR, exist_ok=True)
+        # Write to a temporary file first so readers never see a partial file
+        path = _series_path(self.name)
+        temporary_path = path + ".tmp"
+        with pa.OSFile(temporary_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temporary_path, path)
+
+    def _set_table(self, table, fingerprint):
+        self.table = table
+        self.dates = table.column(DATE_COLUMN).to_numpy() if DATE_COLUMN in table.column_names else np.array([], dtype="datetime64[ns]")
+        self.columns = _non_empty_columns(table)
+        self._fingerprint = fingerprint
+
+    # Drop the cached observations so the next sync fetches everything again
+    def refresh(self):
+        with self._lock:
+            self.table = None
+            self.dates = np.array([], dtype="datetime64[ns]")
+            self.columns = []
+            self._fingerprint = None
+            path = _series_path(self.name)
+            if os.path.exists(path):
+                os.remove(path)
+
+# Number of stations whose time series stay open, the least recently used are closed
+MAX_OPEN_SERIES = 32
+
+# Time series of the process, by name, in least recently used order
+_series = OrderedDict()
+_series_lock = threading.Lock()
+
+# Get the synced time series registered under `name`, `load(start)` fetches the observations from a date on
+def time_series(name, load):
+    with _series_lock:
+        series = _series.get(name)
+        if series is None:
+            series = _series[name] = TimeSeries(name, load)
+            # a closed series is reopened from its file on next use
+            while len(_series) > MAX_OPEN_SERIES:
+                _series.popitem(last=False)
+        _series.move_to_end(name)
+    return series.sync()
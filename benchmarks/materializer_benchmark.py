@@ -0,0 +1,67 @@
+# Micro-benchmark of api.frames.materialize against neo4j's Result.to_df on synthetic records.
+# Run from the repository root: python -m benchmarks.materializer_benchmark
+import sys
+import time
+import random
+import neo4j
+from api.frames import materialize
+
+# Number of synthetic records of each run
+SIZES = [100000, 1000000]
+
+# Declared dtypes of the synthetic weather observation columns
+SCHEMA = {
+    "date": "datetime64[ns]",
+    "precipitation_mm_per_d": "float64",
+    "maxTemperature_degC": "float64",
+    "minTemperature_degC": "float64",
+    "weatherStationId": "category",
+}
+
+# A result replaying in-memory records, enough for to_df and materialize
+class SyntheticResult(neo4j.Result):
+
+    def __init__(self, keys, records):
+        self._keys = keys
+        self._records = records
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def keys(self):
+        return tuple(self._keys)
+
+def make_records(size):
+    keys = list(SCHEMA)
+    stations = [f"STATION{i}" for i in range(20)]
+    records = []
+    for i in range(size):
+        records.append(neo4j.Record(zip(keys, [
+            f"{1980 + i % 40}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            None if i % 7 == 0 else random.random() * 50,
+            random.random() * 40,
+            random.random() * 20,
+            stations[i % len(stations)],
+        ])))
+    return keys, records
+
+def measure(function):
+    start = time.perf_counter()
+    dataframe = function()
+    return time.perf_counter() - start, dataframe.memory_usage(deep=True).sum()
+
+def main(sizes):
+    print(f"{'records':>10} {'method':>22} {'seconds':>9} {'MiB':>9}")
+    for size in sizes:
+        keys, records = make_records(size)
+        runs = {
+            "to_df": lambda: SyntheticResult(keys, records).to_df(),
+            "materialize": lambda: materialize(SyntheticResult(keys, records)),
+            "materialize (schema)": lambda: materialize(SyntheticResult(keys, records), schema=SCHEMA),
+        }
+        for name, function in runs.items():
+            seconds, size_bytes = measure(function)
+            print(f"{size:>10} {name:>22} {seconds:>9.3f} {size_bytes / 2 ** 20:>9.1f}")
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or SIZES)
@@ -0,0 +1,33 @@
+import streamlit as st
+from components.downsampling import downsample_chart_data
+
+# Axis and plot type pickers with the chart they draw, for data the page has already loaded.
+# It runs as a fragment: changing a picker only reruns this function, not the page and its queries.
+@st.fragment
+def chart_explorer(data):
+    # 3 columns to select x-ais, multiple y-axis and plot type
+    x_axis, y_axis, plot_type = st.columns(3)
+    with x_axis:
+        x_axis = st.selectbox("Select x-axis", data.columns, index=0)
+    with y_axis:
+        y_axis = st.multiselect("Select y-axis", data.columns, default=[data.columns[1]] if len(data.columns) > 1 else [])
+    with plot_type:
+        plot_type = st.selectbox("Select plot type", ["line", "bar", "area", "scatter"], index=3)
+
+    # Check if y-axis is selected
+    if y_axis:
+        # Only send as many points as the chart can show, the page's table keeps every row
+        chart_data = downsample_chart_data(data, x_axis, y_axis, plot_type)
+        try:
+            if plot_type == "line":
+                st.line_chart(chart_data, x=x_axis, y=y_axis, use_container_width=True)
+            elif plot_type == "bar":
+                st.bar_chart(chart_data, x=x_axis, y=y_axis, use_container_width=True)
+            elif plot_type == "area":
+                st.area_chart(chart_data, x=x_axis, y=y_axis, use_container_width=True)
+            elif plot_type == "scatter":
+                st.scatter_chart(chart_data, x=x_axis, y=y_axis, use_container_width=True)
+            else:
+                st.info("Please select a plot type to display the data.")
+        except Exception as e:
+            st.info("Something went wrong. Please select a different x-axis or y-axis to display the data.")
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+# Width of a full-width chart in the wide layout, in pixels. Streamlit does not report the
+# rendered width to the script, so pages pass a narrower width for charts inside columns.
+DEFAULT_CHART_WIDTH = 1200
+
+# Pixels per bar of an aggregated bar chart
+BAR_WIDTH = 4
+
+# Numeric positions of the x values: numbers and dates keep their spacing, anything else is evenly spaced
+def _x_positions(values):
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy().astype("datetime64[ns]").astype(np.int64).astype("float64")
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.to_numpy(dtype="float64", na_value=np.nan)
+    return np.arange(len(values), dtype="float64")
+
+# Indices of the points kept by Largest-Triangle-Three-Buckets, which keeps the visual shape of a line.
+# The first and last points are always kept, every bucket in between keeps the point forming the
+# largest triangle with the previously kept point and the average of the next bucket.
+def lttb_indices(x, y, threshold):
+    size = len(y)
+    if threshold >= size or threshold < 3:
+        return np.arange(size)
+    edges = np.linspace(1, size - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, size - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_x, next_y = x[end:edges[bucket + 2]].mean(), y[end:edges[bucket + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous]) - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+# Indices of the minimum and maximum point of each of `buckets` equal-count buckets, plus the first and last point
+def min_max_indices(y, buckets):
+    size = len(y)
+    if size <= 2 * buckets:
+        return np.arange(size)
+    present = np.flatnonzero(~np.isnan(y))
+    bucket_ids = (present * buckets) // size
+    # sort by bucket, then by value: the first and last entry of each bucket are its minimum and maximum
+    order = np.lexsort((y[present], bucket_ids))
+    sorted_ids = bucket_ids[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    ends = np.r_[starts[1:], len(order)] - 1
+    return np.unique(np.r_[present[order[starts]], present[order[ends]], 0, size - 1])
+
+# Aggregate consecutive rows into at most `count` bars: y values are averaged, x keeps the first value
+def aggregate_bars(data, x, y, count):
+    if len(data) <= count:
+        return data
+    buckets = (np.arange(len(data)) * count) // len(data)
+    aggregations = {column: "first" for column in data.columns}
+    for column in y:
+        if column != x and pd.api.types.is_numeric_dtype(data[column]):
+            aggregations[column] = "mean"
+    return data.groupby(buckets).agg(aggregations).reset_index(drop=True)
+
+# Reduce the rows of a chart to what a chart of `width` pixels can show, before it is sent to the browser.
+# Line and area charts of one series use LTTB, several series and scatter charts keep the minimum and
+# maximum of each bucket, and bar charts are aggregated to one bar per BAR_WIDTH pixels.
+# Only the chart data is reduced, tables should keep using the full frame.
+def downsample_chart_data(data, x, y, plot_type, width=DEFAULT_CHART_WIDTH):
+    if len(data) <= width:
+        return data
+    x_values = _x_positions(data[x])
+    if not np.isnan(x_values).any():
+        order = np.argsort(x_values, kind="stable")
+        data, x_values = data.iloc[order], x_values[order]
+
+    if plot_type == "bar":
+        return aggregate_bars(data, x, y, max(width // BAR_WIDTH, 1))
+
+    series = [data[column].to_numpy(dtype="float64", na_value=np.nan) for column in y if pd.api.types.is_numeric_dtype(data[column]) and not pd.api.types.is_bool_dtype(data[column])]
+    if not series:
+        return data
+    if plot_type in ("line", "area") and len(series) == 1:
+        present = np.flatnonzero(~np.isnan(series[0]) & ~np.isnan(x_values))
+        indices = present[lttb_indices(x_values[present], series[0][present], width)]
+    else:
+        indices = np.unique(np.concatenate([min_max_indices(values, max(width // (2 * len(series)), 1)) for values in series]))
+    return data.iloc[indices]
@@ -0,0 +1,62 @@
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+import pandas as pd
+import plotly.io as pio
+
+# Total size of the cached figures, measured as their serialized JSON, in bytes
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Built Plotly figures keyed by a hash of their input data and chart parameters, shared by every session.
+# Each figure is serialized once when it is built to measure it, and the least recently used figures
+# are evicted once the cached size exceeds `max_bytes`. Callers must not modify the returned figures.
+class FigureCache:
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._figures)
+
+    # Get the figure of a key, building it with `build()` on a miss
+    def get(self, key, build):
+        with self._lock:
+            if key in self._figures:
+                self._figures.move_to_end(key)
+                return self._figures[key][0]
+
+        figure = build()
+        size = len(pio.to_json(figure, validate=False))
+        with self._lock:
+            if key not in self._figures:
+                self._figures[key] = (figure, size)
+                self.size += size
+                while self.size > self.max_bytes and len(self._figures) > 1:
+                    _, (_, evicted_size) = self._figures.popitem(last=False)
+                    self.size -= evicted_size
+            return self._figures[key][0]
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+            self.size = 0
+
+# Hash of a DataFrame's values, index and column names
+def data_hash(data):
+    digest = hashlib.sha1(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    digest.update(repr([(str(column), str(dtype)) for column, dtype in data.dtypes.items()]).encode("utf-8"))
+    return digest.hexdigest()
+
+# The figure cache of the process
+_figure_cache = FigureCache()
+
+# Get the figure of `build(data, **params)`, rebuilt only when the data or the parameters change.
+# A cached Figure object is already validated, so st.plotly_chart only converts it to a dict and
+# serializes it, instead of validating a plain dict again through a new Figure.
+def cached_figure(name, data, build, **params):
+    key = (name, data_hash(data), json.dumps(params, sort_keys=True, default=str))
+    return _figure_cache.get(key, lambda: build(data, **params))
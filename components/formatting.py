@@ -0,0 +1,21 @@
+# Placeholder shown in tables for missing values
+NOT_AVAILABLE = "Not Available"
+
+# Replace missing values with placeholder text just before a DataFrame is rendered.
+# DAOs return typed frames with real NA values; only the displayed copy is converted.
+def fill_placeholders(dataframe, placeholder=NOT_AVAILABLE, columns=None):
+    columns = dataframe.columns if columns is None else columns
+    display = dataframe.copy()
+    for column in columns:
+        missing = display[column].isna()
+        if missing.any():
+            display[column] = display[column].astype(object).where(~missing, placeholder)
+    return display
+
+# Format a node property map as Markdown, one bold key and its value per line
+def format_properties(properties, placeholder=NOT_AVAILABLE):
+    lines = []
+    for key, value in properties.items():
+        missing = value is None or (isinstance(value, float) and value != value)
+        lines.append(f"**{key}:** {placeholder if missing else value}  \n")
+    return "".join(lines)
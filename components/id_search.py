@@ -0,0 +1,10 @@
+import streamlit as st
+from api.search import DEFAULT_SEARCH_LIMIT
+
+# A searchable ID picker that only sends the top matches of the search box to the browser
+def id_search_box(label, index, key, limit=DEFAULT_SEARCH_LIMIT):
+    query = st.text_input(label, key=f"{key}_query", placeholder=f"Search {len(index)} IDs...", label_visibility="collapsed")
+    matches = index.search(query, limit)
+    if query and not matches:
+        st.info("No ID matches your search.")
+    return st.selectbox(label, matches, index=None, key=key, label_visibility="collapsed")
@@ -1,13 +1,23 @@
 import streamlit as st
 from langchain_community.graphs import Neo4jGraph
+from api.catalog import get_catalog, on_catalog_refresh
+
+# Serve the schema of a catalog, again whenever the catalog is rebuilt after the graph changes
+def apply_catalog(catalog):
+    neo4j_graph.structured_schema = catalog.get_structured_schema()
+    neo4j_graph.schema = catalog.get_schema_string()
 
 try:
+    # The schema comes from the persisted catalog instead of an introspection on every start
     neo4j_graph = Neo4jGraph(
         url = st.secrets['NEO4J_URI'],
         username = st.secrets['NEO4J_USERNAME'],
         password = st.secrets['NEO4J_PASSWORD'],
         enhanced_schema=False,
+        refresh_schema=False,
     )
+    apply_catalog(get_catalog())
+    on_catalog_refresh(apply_catalog)
 except Exception as e:
     st.error(f"Error connecting to the database with the error message:\n {e}")
-    st.stop()
\ No newline at end of file
+    st.stop()
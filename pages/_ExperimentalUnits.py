@@ -2,6 +2,11 @@ from api.neo4j import init_driver
 import streamlit as st
 from api.dao.experimentalUnit import ExperimentalUnitDAO
 from components.navigation_bar import navigation_bar
+from api.cache import shared_indexed_table, get_graph_fingerprint
+from api.facets import FacetIndex
+from components.formatting import fill_placeholders
+from components.chart_explorer import chart_explorer
+from components.figure_cache import cached_figure
 import plotly.express as px
 import re
 import pandas as pd
@@ -51,9 +56,8 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# Cache experimental unit data to avoid repeated queries
-if 'exp_unit_info' not in st.session_state:
-    # Assuming exp_unit_dao.get_filters() returns a DataFrame
+# Build the experimental unit filter table
+def load_exp_unit_info():
     exp_unit_info = exp_unit_dao.get_filters()
 
     # Map duplicate name: USA to United States
@@ -67,20 +71,22 @@ if 'exp_unit_info' not in st.session_state:
 
     # Add full state names to the DataFrame
     exp_unit_info['stateNameFull'] = exp_unit_info['stateName'].map(state_abbreviation_to_name)
+    return exp_unit_info
 
-    st.session_state.exp_unit_info = exp_unit_info
+# Location levels of the drill-down, from state to field
+LOCATION_LEVELS = ['stateNameFull', 'countyName', 'cityName', 'siteId', 'fieldId']
+
+# The filter table and its location index, shared read-only by every session of the process
+exp_unit_info_table = shared_indexed_table("exp_unit_info", load_exp_unit_info, lambda exp_unit_info: FacetIndex(exp_unit_info, LOCATION_LEVELS + ['stateName'], levels=LOCATION_LEVELS))
+exp_unit_info, exp_unit_facets = exp_unit_info_table.get()
+
+# Let users reload the shared filter table after a data update
+st.sidebar.button("Refresh experimental units", on_click=exp_unit_info_table.refresh, use_container_width=True)
 
 # Cache selected experimental unit
 if 'selected_exp_unit' not in st.session_state:
     st.session_state.selected_exp_unit = None
 
-# Function to update filter options
-def update_filter_options(df, filters):
-    for column, value in filters.items():
-        if value and value != 'Clear':
-            df = df[df[column] == value]
-    return df
-
 # Initialize session state for filters
 if 'filters' not in st.session_state:
     st.session_state.filters = {
@@ -96,73 +102,76 @@ def update_filter(filter_name):
     def callback():
         value = st.session_state[filter_name]
         st.session_state.filters[filter_name] = value if value != 'Clear' else None
+        # drop selections that are not in the newly selected location
+        st.session_state.filters = exp_unit_facets.prune(st.session_state.filters)
         st.session_state.selected_exp_unit = None
     return callback
 
+# Filter once per rerun: matching rows and the options left at every level come from the location index
+filtered_rows, options = exp_unit_facets.query(st.session_state.filters)
+
 # Create filter widgets
 columns = st.columns(4)
 
 with columns[0]:
-    filtered_df = update_filter_options(st.session_state.exp_unit_info, st.session_state.filters)
-    states = ['Clear'] + sorted(filtered_df['stateNameFull'].unique().tolist())
+    states = ['Clear'] + options['stateNameFull']
     index = states.index(st.session_state.filters['stateNameFull']) if st.session_state.filters['stateNameFull'] in states else 0
     st.selectbox("Select a State:", states, index=index, key='stateNameFull', on_change=update_filter('stateNameFull'))
 
 with columns[1]:
-    filtered_df = update_filter_options(st.session_state.exp_unit_info, st.session_state.filters)
-    counties = ['Clear'] + sorted(filtered_df['countyName'].unique().tolist())
+    counties = ['Clear'] + options['countyName']
     index = counties.index(st.session_state.filters['countyName']) if st.session_state.filters['countyName'] in counties else 0
     st.selectbox("Select a County:", counties, index=index, key='countyName', on_change=update_filter('countyName'))
 
 with columns[2]:
-    filtered_df = update_filter_options(st.session_state.exp_unit_info, st.session_state.filters)
-    sites = ['Clear'] + sorted(filtered_df['siteId'].unique().tolist())
+    sites = ['Clear'] + options['siteId']
     index = sites.index(st.session_state.filters['siteId']) if st.session_state.filters['siteId'] in sites else 0
     st.selectbox("Select a Site:", sites, index=index, key='siteId', on_change=update_filter('siteId'))
 
 with columns[3]:
-    filtered_df = update_filter_options(st.session_state.exp_unit_info, st.session_state.filters)
-    fields = ['Clear'] + sorted(filtered_df['fieldId'].unique().tolist())
+    fields = ['Clear'] + options['fieldId']
     index = fields.index(st.session_state.filters['fieldId']) if st.session_state.filters['fieldId'] in fields else 0
     st.selectbox("Select a Field:", fields, index=index, key='fieldId', on_change=update_filter('fieldId'))
 
 # Apply all filters
-filtered_data = update_filter_options(st.session_state.exp_unit_info, st.session_state.filters)
+filtered_data = exp_unit_info[filtered_rows]
 
-# Dataframe for state and number of experimental units in each state, total sites and total fields
-state_counts = filtered_data.groupby('stateName').size().reset_index(name='Total Experimental Units')
+# Dataframe for state and number of experimental units in each state, counted from the location index
+state_counts = pd.DataFrame(list(exp_unit_facets.counts('stateName', filtered_rows).items()), columns=['stateName', 'Total Experimental Units'])
 state_counts['fullStateName'] = state_counts['stateName'].map(state_abbreviation_to_name)
 
-# Plotly Express choropleth map
-fig = px.choropleth(
-    state_counts,
-    locationmode="USA-states",
-    locations="stateName",
-    color="Total Experimental Units",
-    scope="usa",
-    hover_name="fullStateName",
-    hover_data= {"stateName": False, "Total Experimental Units": True},
-)
-
-# Get selected state
-selected_state = st.session_state.filters['stateNameFull']
-# Highlight the selected state if one is chosen
-if selected_state:
-    fig.add_scattergeo(
-        # map
-        locations=[state_name_to_abbreviation[selected_state]],
+# Build the USA choropleth of the state counts, highlighting the selected state
+def create_state_map(state_counts, selected_state=None):
+    # Plotly Express choropleth map
+    fig = px.choropleth(
+        state_counts,
         locationmode="USA-states",
-        marker=dict(size=10, color="red", symbol="star"),
-        name="Selected State"
+        locations="stateName",
+        color="Total Experimental Units",
+        scope="usa",
+        hover_name="fullStateName",
+        hover_data= {"stateName": False, "Total Experimental Units": True},
     )
 
-# Update the layout
-fig.update_layout(
-    geo_scope='usa',
-    margin={"r": 0, "t": 50, "l": 0, "b": 0},
-)
+    # Highlight the selected state if one is chosen
+    if selected_state:
+        fig.add_scattergeo(
+            # map
+            locations=[state_name_to_abbreviation[selected_state]],
+            locationmode="USA-states",
+            marker=dict(size=10, color="red", symbol="star"),
+            name="Selected State"
+        )
+
+    # Update the layout
+    fig.update_layout(
+        geo_scope='usa',
+        margin={"r": 0, "t": 50, "l": 0, "b": 0},
+    )
+    return fig
 
-# Display the map
+# Display the map, only rebuilt when the counts or the selected state change
+fig = cached_figure('state_map', state_counts, create_state_map, selected_state=st.session_state.filters['stateNameFull'])
 st.plotly_chart(fig)
 
 
@@ -244,11 +253,14 @@ def camel_snake_to_normal(camel_snake_str):
     else:   
         return camel_to_normal(camel_snake_str)
 
-def create_pie_chart(data):
+def create_pie_chart(stats):
     # convert camel case to normal case for column names
-    data = {camel_snake_to_normal(k): v for k, v in data.items()}
+    stats = {camel_snake_to_normal(k): v for k, v in stats.items()}
     # convert data to a DataFrame
-    data = pd.DataFrame(data.items(), columns=['Event Name', 'Number of Samples'])
+    data = pd.DataFrame(stats.items(), columns=['Event Name', 'Number of Samples'])
+    return cached_figure('sample_pie', data, build_pie_chart)
+
+def build_pie_chart(data):
     fig = px.pie(
         data,
         names='Event Name',
@@ -299,12 +311,19 @@ if selected_exp_unit or st.session_state.selected_exp_unit:
     st.write("")
     cols = st.columns(2)
     events = []
+    # Fetch the unit profile once per selected unit and graph fingerprint, switching sample types reuses it
+    exp_unit_profile_key = (st.session_state.selected_exp_unit, get_graph_fingerprint())
+    if st.session_state.get('exp_unit_profile_key') != exp_unit_profile_key:
+        st.session_state.exp_unit_profile = exp_unit_dao.get_unit_profile(st.session_state.selected_exp_unit)
+        st.session_state.exp_unit_profile_key = exp_unit_profile_key
+    profile = st.session_state.exp_unit_profile
+    sample_counts = profile['sample_counts']
     with cols[0]:
-        display_spatial_info(st.session_state.exp_unit_info)
+        display_spatial_info(exp_unit_info)
     with cols[1]:
-        tabs = st.tabs(["Measurement", "Planting and Harvesting", "Management"])
+        tabs = st.tabs(["Measurement", "Planting and Harvesting", "Management", "Treatments"])
         with tabs[0]:
-            stats = exp_unit_dao.get_all_measurement_sample_counts(st.session_state.selected_exp_unit)
+            stats = exp_unit_dao.get_all_measurement_sample_counts(st.session_state.selected_exp_unit, sample_counts)
             stats = {k: v for k, v in stats.items() if v > 0}
             if not stats:
                 st.info("No measurement sample found for the selected experimental unit.")
@@ -314,7 +333,7 @@ if selected_exp_unit or st.session_state.selected_exp_unit:
                 fig = create_pie_chart(stats)
                 st.plotly_chart(fig)
         with tabs[1]:
-            stats = exp_unit_dao.get_all_planting_and_harvesting_sample_counts(st.session_state.selected_exp_unit)
+            stats = exp_unit_dao.get_all_planting_and_harvesting_sample_counts(st.session_state.selected_exp_unit, sample_counts)
             stats = {k: v for k, v in stats.items() if v > 0}
             if not stats:
                 st.info("No planting and harvesting sample found for the selected experimental unit.")
@@ -324,7 +343,7 @@ if selected_exp_unit or st.session_state.selected_exp_unit:
                 fig = create_pie_chart(stats)
                 st.plotly_chart(fig)
         with tabs[2]:
-            stats = exp_unit_dao.get_all_mamagement_events(st.session_state.selected_exp_unit)
+            stats = exp_unit_dao.get_all_mamagement_events(st.session_state.selected_exp_unit, sample_counts)
             stats = {k: v for k, v in stats.items() if v > 0}
             if not stats:
                 st.info("No management events found for the selected experimental unit.")
@@ -333,6 +352,11 @@ if selected_exp_unit or st.session_state.selected_exp_unit:
                     events.append(event_type)
                 fig = create_pie_chart(stats)
                 st.plotly_chart(fig)
+        with tabs[3]:
+            if profile['treatments'].empty:
+                st.info("No treatments found for the selected experimental unit.")
+            else:
+                st.dataframe(fill_placeholders(profile['treatments']), use_container_width=True, hide_index=True)
 
     # Filter to further narrow down the experimental units event to display
     st.markdown('<div class="info-box"> Select any data property to view more details</div>', unsafe_allow_html=True)
@@ -341,36 +365,16 @@ if selected_exp_unit or st.session_state.selected_exp_unit:
 
     # Check if event name is selected
     if event_name:
-        data = exp_unit_dao.get_all_data_samples(st.session_state.selected_exp_unit, event_name)
+        data = profile['samples'][event_name].copy()
         data.columns = [camel_snake_to_normal(col) for col in data.columns]
-        st.dataframe(data, use_container_width=True)
+        if sample_counts[event_name] > profile['page_counts'][event_name]:
+            st.caption(f"Showing the first {profile['page_counts'][event_name]} of {sample_counts[event_name]} samples.")
+        st.dataframe(fill_placeholders(data), use_container_width=True)
         
-        # 3 columns to select x-ais, multiple y-axis and plot type
         st.markdown('<div class="info-box">You can also visualize the data on a 2D graph</div>', unsafe_allow_html=True)
         st.write("")
-        x_axis, y_axis, plot_type = st.columns(3)
-        with x_axis:
-            x_axis = st.selectbox("Select x-axis", data.columns, index=0)
-        with y_axis:
-            y_axis = st.multiselect("Select y-axis", data.columns, default=[data.columns[1]])
-        with plot_type:
-            plot_type = st.selectbox("Select plot type", ["line", "bar", "area", "scatter"], index=3)
-        
-        # Check if y-axis is selected
-        if y_axis:
-            try:
-                if plot_type == "line":
-                    st.line_chart(data, x=x_axis, y=y_axis, use_container_width=True)
-                elif plot_type == "bar":
-                    st.bar_chart(data, x=x_axis, y=y_axis, use_container_width=True)
-                elif plot_type == "area":
-                    st.area_chart(data, x=x_axis, y=y_axis, use_container_width=True)
-                elif plot_type == "scatter":
-                    st.scatter_chart(data, x=x_axis, y=y_axis, use_container_width=True)
-                else:
-                    st.info("Please select a plot type to display the data.")
-            except Exception as e:
-                st.info("Something went wrong. Please select a different x-axis or y-axis to display the data.")
+        # Chart controls rerun only the chart, the unit profile is not fetched again
+        chart_explorer(data)
             
     
     
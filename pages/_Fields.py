@@ -3,7 +3,11 @@ import streamlit as st
 from api.dao.field import FieldDAO
 from components.navigation_bar import navigation_bar
 from components.get_pydeck_chart import get_pydeck_chart
-import pandas as pd
+from components.id_search import id_search_box
+from api.search import get_id_index
+from api.rollups import GRANULARITIES, get_rollups
+from api.executor import submit
+from components.formatting import fill_placeholders, format_properties
 
 # Page config and icon
 st.set_page_config(layout="wide", page_title="Fields View", page_icon=":national_park:")
@@ -18,10 +22,10 @@ st.markdown("<h1 style='text-align: center; color: #4CAF50;'>Field Exploration</
 
 # Get all fields from the database
 field_dao = FieldDAO(driver)
-ids = field_dao.get_all_ids()
+field_index = get_id_index("Field", field_dao.get_all_ids)
 
 # Error checking
-if not ids:
+if not len(field_index):
     st.error("No fields found in the database.")
 
 # initialize selected field in session state if not already initialized
@@ -30,7 +34,7 @@ if 'selected_field' not in st.session_state:
 
 # Field selection
 st.subheader("Select a Field:")
-option = st.selectbox("Select a field to explore:", ids, index=None, label_visibility="collapsed")
+option = id_search_box("Select a field to explore:", field_index, key="field_search")
 if option is not None:
     st.session_state['selected_field'] = option
 
@@ -38,7 +42,15 @@ if option is not None:
 if st.session_state.selected_field is None:
     st.stop()
 
-field_info = field_dao.get_field_info(st.session_state.selected_field)
+# Start the independent reads of the page together, each section waits only for its own result
+selected_field = st.session_state.selected_field
+field_info_future = submit(field_dao.get_field_info, selected_field)
+exp_units_future = submit(field_dao.get_all_experimental_unit, selected_field)
+lat_long_future = submit(field_dao.get_lat_long_dataframe, selected_field)
+rollups_future = submit(get_rollups, f"field:{selected_field}", lambda: field_dao.get_daily_weather(selected_field))
+publications_future = submit(field_dao.get_publications, selected_field)
+
+field_info = field_info_future.result()
 
 # Description of the selected field
 field_description = ""
@@ -47,15 +59,8 @@ field_description = ""
 if 'selected_field' in st.session_state:
     field_description += f"**Field ID:** {st.session_state['selected_field']}  \n"
 
-# Replace NaN in 'property' column with 'Not Available'
-field_info['property'] = field_info['property'].fillna('Not Available')
-
-# Ensure all fields in 'field_info' are strings
-field_info = field_info.astype(str)
-
-# Construct the field description from each row in 'field_info'
-for _, row in field_info.iterrows():
-    field_description += f"**{row['key']}:** {row['property']}  \n"
+# Add the properties of the field's site
+field_description += format_properties(field_info)
 
 # Display the constructed field description
 st.info(field_description)
@@ -65,7 +70,7 @@ col1, col2 = st.columns(2)
 
 with col1:
     # Get experimental unit data
-    exp_units = field_dao.get_all_experimental_unit(st.session_state.selected_field)
+    exp_units = exp_units_future.result()
     st.subheader("Experimental Units On Field")
 
     # Check if there are no experimental units
@@ -80,15 +85,14 @@ with col1:
         exp_units.rename(columns={"id": "Experimental Unit ID", "Start_Date": "Start Date", "End_Date": "End Date", "Size": "Size"}, inplace=True)
 
         # Replace None start date and end date with "Not Available"
-        exp_units['Start Date'] = exp_units['Start Date'].apply(lambda x: "Not Available" if pd.isnull(x) else x)
-        exp_units['End Date'] = exp_units['End Date'].apply(lambda x: "Not Available" if pd.isnull(x) else x)
+        exp_units = fill_placeholders(exp_units, columns=['Start Date', 'End Date'])
 
         # If size are all empty, drop the column
         if exp_units['Size'].isnull().all():
             exp_units.drop(columns=['Size'], inplace=True)
         else:
             # Replace size with "Unknown" if it is empty
-            exp_units['Size'] = exp_units['Size'].apply(lambda x: "Unknown" if pd.isnull(x) else x)
+            exp_units = fill_placeholders(exp_units, "Unknown", columns=['Size'])
         
         event = st.dataframe(
             exp_units,
@@ -104,7 +108,7 @@ with col1:
             st.switch_page("pages/_ExperimentalUnits.py")
 with col2:
     # Get latitude and longitude of the selected field
-    df = field_dao.get_lat_long_dataframe(st.session_state.selected_field)
+    df = lat_long_future.result()
     st.subheader("Field Location")
 
     # check if longitude and latitude are nan or nont
@@ -115,10 +119,17 @@ with col2:
         st.info(f"(Latitude, Longitude): ({df['latitude'].values[0]}, {df['longitude'].values[0]})")
         st.pydeck_chart(get_pydeck_chart(df['longitude'].values[0], df['latitude'].values[0]))
 
-rainfall_df = field_dao.get_rainfall_df(st.session_state.selected_field)
-# Check if rainfall data is not empty
-if not rainfall_df.empty:
+# Precipitation of the field at the selected granularity. It runs as a fragment over the rollups the page
+# already loaded, so switching granularity reruns only this section and queries nothing.
+@st.fragment
+def precipitation_section(rollups):
+    rainfall_df = rollups["Quarterly"]
+    # Check if rainfall data is not empty
+    if rainfall_df.empty or 'precipitation_mm_per_d' not in rainfall_df.columns:
+        return
     st.subheader("Precipitation over Time")
+    granularity = st.radio("Granularity", GRANULARITIES, index=GRANULARITIES.index("Quarterly"), horizontal=True, key="precipitation_granularity")
+    rainfall_df = rollups[granularity][['Period', 'precipitation_mm_per_d']].rename(columns={'precipitation_mm_per_d': 'TotalPrecipitation'})
     # Drop rows with missing values
     rainfall_df = rainfall_df.dropna()
     if rainfall_df is not None and not rainfall_df.empty:
@@ -140,11 +151,13 @@ if not rainfall_df.empty:
     else:
         st.write("No rainfall data available.")
 
+# Weather rollups of the field, computed once per graph version
+precipitation_section(rollups_future.result())
+
 # get all publicaions in a field
-publications_df = field_dao.get_publications(st.session_state.selected_field)
+publications_df = publications_future.result()
 # Check if publications are not empty
 if not publications_df.empty:
     st.subheader("Publications on Field")
     # Replace None with "Not Available"
-    publications_df = publications_df.fillna("Not Available")
-    st.dataframe(publications_df, use_container_width=True)
+    st.dataframe(fill_placeholders(publications_df), use_container_width=True)
@@ -1,11 +1,11 @@
 import streamlit as st
-from api.neo4j import init_driver
 from components.navigation_bar import navigation_bar
 from st_link_analysis import st_link_analysis, NodeStyle, EdgeStyle
-from api.dao.general import GeneralDAO
 import random
 from st_link_analysis.component.layouts import LAYOUTS
 import json
+import copy
+from api.catalog import get_catalog
 
 # Constants
 LAYOUT_LIST = list(LAYOUTS.keys())
@@ -14,10 +14,6 @@ CURVE_LIST = ["bezier", "haystack", "straight", "unbundled-bezier", "round-segme
 # Page configuration
 st.set_page_config(layout="wide", page_title="Ontology View", page_icon=":satellite_antenna:")
 
-# Initialize Neo4j driver and DAO
-driver = init_driver()
-dao = GeneralDAO(driver)
-
 # Helper functions
 def random_color():
     """Generate a random color in hexadecimal format."""
@@ -38,18 +34,20 @@ def update_elements():
     selected_node = st.session_state.get("ontology", None)
     if selected_node and selected_node["action"] == "expand":
         node_id = selected_node["data"]['node_ids'][0]
-        raw_attributes, view_attributes = dao.get_node_attributes(node_id)
+        # Attribute profiles come from the schema catalog, no query on expansion
+        profile = get_catalog().get_label_profile(node_id)
         
-        for raw_attr, view_attr in zip(raw_attributes, view_attributes):
-            example_value = dao.get_example_value(node_id, raw_attr)
-            example_value = ', '.join(example_value) + ",..." if example_value else "N/A"
+        for attribute in profile:
+            raw_attr = attribute["key"]
+            example_value = ', '.join(attribute["examples"]) + ",..." if attribute["examples"] else "N/A"
             
             new_node = {
                 "data": {
                     "id": raw_attr,
                     "label": raw_attr,
                     "Example Values": example_value,
-                    "caption": view_attr
+                    "Missing Values": f"{attribute['null_ratio']:.0%}",
+                    "caption": attribute["caption"]
                 }
             }
             new_edge = {
@@ -76,7 +74,8 @@ def load_predifined_graph():
 if "elements" not in st.session_state:
     with open("./location.json", "r") as f:
         location_dict = json.load(f)
-    st.session_state.elements = dao.get_ontology_data()
+    # Each session expands its own copy of the catalog's ontology elements
+    st.session_state.elements = copy.deepcopy(get_catalog().get_ontology_elements())
     for node in st.session_state.elements["nodes"]:
         node["position"] = location_dict[node["data"]["id"]]
     
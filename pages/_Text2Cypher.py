@@ -1,6 +1,6 @@
 import streamlit as st
 from tools.text2cypher import generate_cypher
-from api.dao.general import GeneralDAO
+from api.dao.general import GeneralDAO, QueryBudgetExceeded
 from tools.rating import save_ratings
 from api.neo4j import init_driver
 from components.navigation_bar import navigation_bar
@@ -98,8 +98,15 @@ if state['cypher_code']:
     
     st.subheader("Query Result")
     general_dao = GeneralDAO(driver)
-    query_result = general_dao.run_query(state['cypher_code'])
-    st.dataframe(data=query_result, hide_index=False, use_container_width=True)
+    try:
+        query_result, truncated = general_dao.run_guarded_query(state['cypher_code'])
+        if truncated:
+            st.warning(f"Only the first {query_result.shape[0]} rows are shown.")
+        st.dataframe(data=query_result, hide_index=False, use_container_width=True)
+    except QueryBudgetExceeded as e:
+        st.error(f"❌ The query was not run: {e}")
+    except Exception as e:
+        st.error(f"❌ An error occurred while running the query: {e}")
     
     if not state['rated']:
         st.markdown("### Rate this response:")
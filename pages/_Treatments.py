@@ -4,6 +4,10 @@ import re
 from api.dao.treatment import TreatmentDAO
 import plotly.express as px
 from components.navigation_bar import navigation_bar
+from api.cache import shared_indexed_table
+from api.facets import FacetIndex, UNKNOWN
+from components.formatting import fill_placeholders
+from components.figure_cache import cached_figure
 
 # Page config and icon
 st.set_page_config(layout="wide", page_title="Treatments View", page_icon=":pill:")
@@ -38,22 +42,27 @@ def camel_snake_to_normal(camel_snake_str):
     else:   
         return camel_to_normal(camel_snake_str)
 
-# Cache the original data to avoid re-fetching
-if "all_treatments" not in st.session_state:
-    st.session_state.all_treatments = dao.get_all_treatments()
+# Pie chart of the distribution of a column, missing values are shown as 'unknown'
+def distribution_pie(data, column, title):
+    return px.pie(fill_placeholders(data[[column]], UNKNOWN), names=column, title=title)
+
+# Columns of the cascading filters
+FACET_COLUMNS = ['coverCrop', 'residueRemoval', 'fertilizerAmendmentClass', 'organicManagement', 'irrigation']
+
+# The treatments table and its facet index, shared read-only by every session
+treatments_table = shared_indexed_table("all_treatments", dao.get_all_treatments, lambda treatments: FacetIndex(treatments, FACET_COLUMNS, range_column='numericNitrogen'))
+all_treatments, treatment_facets = treatments_table.get()
 if "selected_treatment" not in st.session_state:
     st.session_state.selected_treatment = None
 
-# Function to update filter options
-def update_filter_options(df, treatment_filter):
-    for column, value in treatment_filter.items():
-        if column == 'nitrogenRange':
-            df = df[(df['numericNitrogen'] >= value[0]) & (df['numericNitrogen'] <= value[1])]
-        elif value and value != 'Clear':
-            df = df[df[column] == value]
-            # clear selected treatment
-            st.session_state.selected_treatment = None
-    return df
+# Get the rows matching every filter and the options left for each filter, from the facet bitmaps
+def apply_filters(treatment_filter):
+    facet_filter = {column: value for column, value in treatment_filter.items() if column != 'nitrogenRange'}
+    facet_filter['numericNitrogen'] = treatment_filter['nitrogenRange']
+    if any(facet_filter[column] for column in FACET_COLUMNS):
+        # clear selected treatment
+        st.session_state.selected_treatment = None
+    return treatment_facets.query(facet_filter)
 
 # Initialize session state for treatment_filter
 if 'treatment_filter' not in st.session_state:
@@ -63,10 +72,7 @@ if 'treatment_filter' not in st.session_state:
         'fertilizerAmendmentClass': None,
         'organicManagement': False,
         'irrigation': False,
-        'nitrogenRange': (
-            st.session_state.all_treatments['numericNitrogen'].min(),
-            st.session_state.all_treatments['numericNitrogen'].max()
-        )
+        'nitrogenRange': treatment_facets.range
     }
 
 # Callback function to update session state
@@ -76,70 +82,72 @@ def update_filter(filter_name):
         st.session_state.treatment_filter[filter_name] = value if value != 'Clear' else None
     return callback
 
+# Filter once per rerun, every widget reads its options from the same result
+filtered_rows, options = apply_filters(st.session_state.treatment_filter)
+
+# Options of a filter column, missing values are offered as 'unknown'
+def filter_options(column):
+    return ['Clear'] + options[column]
+
 # Create filter widgets
 columns = st.columns(5)
 
 with columns[0]:
     cols = st.tabs(["Filter", "Distribution"])
     with cols[0]:
-        filtered_df = update_filter_options(st.session_state.all_treatments, st.session_state.treatment_filter)
-        cover_crops = ['Clear'] + sorted(filtered_df['coverCrop'].unique().tolist())
+        cover_crops = filter_options('coverCrop')
         index = cover_crops.index(st.session_state.treatment_filter['coverCrop']) if st.session_state.treatment_filter['coverCrop'] in cover_crops else 0
         st.selectbox("Select Cover Crop:", cover_crops, index=index, key='coverCrop', on_change=update_filter('coverCrop'))
     with cols[1]:
-        fig = px.pie(st.session_state['all_treatments'], names='coverCrop', title='Cover Crop Distribution')
+        fig = cached_figure('distribution_pie', all_treatments[['coverCrop']], distribution_pie, column='coverCrop', title='Cover Crop Distribution')
         st.plotly_chart(fig)
 
 with columns[1]:
     cols = st.tabs(["Filter", "Distribution"])
     with cols[0]:
-        filtered_df = update_filter_options(st.session_state.all_treatments, st.session_state.treatment_filter)
-        residue_removals = ['Clear'] + sorted(filtered_df['residueRemoval'].unique().tolist())
+        residue_removals = filter_options('residueRemoval')
         index = residue_removals.index(st.session_state.treatment_filter['residueRemoval']) if st.session_state.treatment_filter['residueRemoval'] in residue_removals else 0
         st.selectbox("Select Residue Removal:", residue_removals, index=index, key='residueRemoval', on_change=update_filter('residueRemoval'))
     with cols[1]:
-        fig = px.pie(st.session_state['all_treatments'], names='residueRemoval', title='Residue Removal Distribution')
+        fig = cached_figure('distribution_pie', all_treatments[['residueRemoval']], distribution_pie, column='residueRemoval', title='Residue Removal Distribution')
         st.plotly_chart(fig)
 
 with columns[2]:
     cols = st.tabs(["Filter", "Distribution"])
     with cols[0]:
-        filtered_df = update_filter_options(st.session_state.all_treatments, st.session_state.treatment_filter)
-        fertilizer_classes = ['Clear'] + sorted(filtered_df['fertilizerAmendmentClass'].unique().tolist())
+        fertilizer_classes = filter_options('fertilizerAmendmentClass')
         index = fertilizer_classes.index(st.session_state.treatment_filter['fertilizerAmendmentClass']) if st.session_state.treatment_filter['fertilizerAmendmentClass'] in fertilizer_classes else 0
         st.selectbox("Select Fertilizer Class:", fertilizer_classes, index=index, key='fertilizerAmendmentClass', on_change=update_filter('fertilizerAmendmentClass'))
     with cols[1]:
-        fig = px.pie(st.session_state['all_treatments'], names='fertilizerAmendmentClass', title='Fertilizer Class Distribution')
+        fig = cached_figure('distribution_pie', all_treatments[['fertilizerAmendmentClass']], distribution_pie, column='fertilizerAmendmentClass', title='Fertilizer Class Distribution')
         st.plotly_chart(fig)
 with columns[3]:
     cols = st.tabs(["Filter", "Distribution"])
     with cols[0]:
-        filtered_df = update_filter_options(st.session_state.all_treatments, st.session_state.treatment_filter)
-        organic_management = ['Clear'] + sorted(filtered_df['organicManagement'].unique().tolist())
+        organic_management = filter_options('organicManagement')
         index = organic_management.index(st.session_state.treatment_filter['organicManagement']) if st.session_state.treatment_filter['organicManagement'] in organic_management else 0
         st.selectbox("Select Organic Management:", organic_management, index=index, key='organicManagement', on_change=update_filter('organicManagement'))
     with cols[1]:
-        fig = px.pie(st.session_state['all_treatments'], names='organicManagement', title='Organic Management Distribution')
+        fig = cached_figure('distribution_pie', all_treatments[['organicManagement']], distribution_pie, column='organicManagement', title='Organic Management Distribution')
         st.plotly_chart(fig)
 with columns[4]:
     cols = st.tabs(["Filter", "Distribution"])
     with cols[0]:
-        filtered_df = update_filter_options(st.session_state.all_treatments, st.session_state.treatment_filter)
-        irrigation = ['Clear'] + sorted(filtered_df['irrigation'].unique().tolist())
+        irrigation = filter_options('irrigation')
         index = irrigation.index(st.session_state.treatment_filter['irrigation']) if st.session_state.treatment_filter['irrigation'] in irrigation else 0
         st.selectbox("Select Irrigation:", irrigation, index=index, key='irrigation', on_change=update_filter('irrigation'))
     with cols[1]:
-        fig = px.pie(st.session_state['all_treatments'], names='irrigation', title='Irrigation Distribution')
+        fig = cached_figure('distribution_pie', all_treatments[['irrigation']], distribution_pie, column='irrigation', title='Irrigation Distribution')
         st.plotly_chart(fig)
 
 # Apply all treatment_filter
-filtered_data = update_filter_options(st.session_state.all_treatments, st.session_state.treatment_filter)
+filtered_data = all_treatments[filtered_rows]
 
 # Add nitrogen amount slider
 st.slider(
     "Nitrogen Amount",
-    min_value=st.session_state.all_treatments['numericNitrogen'].min(),
-    max_value=st.session_state.all_treatments['numericNitrogen'].max(),
+    min_value=treatment_facets.range[0],
+    max_value=treatment_facets.range[1],
     value=st.session_state.treatment_filter['nitrogenRange'],
     key='nitrogenRange',
     on_change=update_filter('nitrogenRange'),
@@ -157,15 +165,15 @@ st.subheader("Filtered Treatments:")
 selected_treatment = None
 
 # Check if treatment_filter are applied
-if st.session_state.treatment_filter['coverCrop'] or st.session_state.treatment_filter['residueRemoval'] or st.session_state.treatment_filter['fertilizerAmendmentClass'] or st.session_state.treatment_filter['organicManagement'] or st.session_state.treatment_filter['irrigation'] or st.session_state.treatment_filter['nitrogenRange'] != (st.session_state.all_treatments['numericNitrogen'].min(), st.session_state.all_treatments['numericNitrogen'].max()):
+if st.session_state.treatment_filter['coverCrop'] or st.session_state.treatment_filter['residueRemoval'] or st.session_state.treatment_filter['fertilizerAmendmentClass'] or st.session_state.treatment_filter['organicManagement'] or st.session_state.treatment_filter['irrigation'] or tuple(st.session_state.treatment_filter['nitrogenRange']) != treatment_facets.range:
     st.info(f"Number of treatments found: {filtered_data.shape[0]}")
     # Reset index
-    filtered_data.reset_index(drop=True, inplace=True)
+    filtered_data = filtered_data.reset_index(drop=True)
     # Reset order of columns
     filtered_data = filtered_data[["treatmentId", "treatmentDescriptor", "coverCrop", "residueRemoval", "fertilizerAmendmentClass", "organicManagement", "irrigation", "nitrogenTreatmentDescriptor", "numericNitrogen"]]
     
     # Selectable table
-    st.dataframe(filtered_data, use_container_width=True, column_config=col_config)
+    st.dataframe(fill_placeholders(filtered_data, UNKNOWN), use_container_width=True, column_config=col_config)
     # event = st.dataframe(filtered_data, use_container_width=True, column_config=col_config, on_select='rerun', selection_mode='single-row')
     # selected_row = event.selection.rows
 
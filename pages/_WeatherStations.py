@@ -1,9 +1,13 @@
 from api.neo4j import init_driver
 import streamlit as st
 from api.dao.weatherStation import weatherStationDAO
-import pandas as pd
+from api.timeseries import time_series
 from components.navigation_bar import navigation_bar
 from components.get_pydeck_chart import get_pydeck_chart
+from components.id_search import id_search_box
+from components.formatting import fill_placeholders, format_properties
+from components.chart_explorer import chart_explorer
+from api.search import get_id_index
 
 driver = init_driver()
 # Page config and icon
@@ -36,10 +40,10 @@ weather_station_dao = weatherStationDAO(driver)
 
 
 # Get all weather stations from the database
-ids = weather_station_dao.get_all_ids()
+weather_station_index = get_id_index("WeatherStation", weather_station_dao.get_all_ids)
 
 # Error checking
-if not ids:
+if not len(weather_station_index):
     st.error("No weather stations found in the database.")
 
 # Weather station selection (original box choice)
@@ -49,7 +53,7 @@ st.subheader("Select a Weather Station:")
 if 'selected_weather_station' not in st.session_state:
     st.session_state.selected_weather_station = None
 
-option = st.selectbox("Choose a weather station to explore:", ids, index=None, label_visibility="collapsed")
+option = id_search_box("Choose a weather station to explore:", weather_station_index, key="weather_station_search")
 if option is not None:
     st.session_state.selected_weather_station = option
 
@@ -60,39 +64,28 @@ if st.session_state.selected_weather_station is None:
 # Main content
 weather_station_info = weather_station_dao.get_weather_station_info(st.session_state.selected_weather_station)
 
-weather_station_des = ""
-
-# Replace NaN in 'property' column with 'Not Available'
-weather_station_info['property'] = weather_station_info['property'].fillna('Not Available')
-
-# Ensure all fields in 'field_info' are strings
-weather_station_info = weather_station_info.astype(str)
-
-# Construct the field description from each row in 'field_info'
-for _, row in weather_station_info.iterrows():
-    weather_station_des += f"**{row['key']}:** {row['property']}  \n"
+# Construct the weather station description from its properties
+weather_station_des = format_properties(weather_station_info)
 
 # Display the constructed field description
 st.info(weather_station_des)
 
 st.divider()
 
-# Get weather observations of a weather station
-weather_observation_df = weather_station_dao.get_weather_observation(st.session_state.selected_weather_station)
+# Get the locally cached weather observations of a weather station, only new observations are fetched
+weather_station_id = st.session_state.selected_weather_station
+weather_observations = time_series(f"weather_observations:{weather_station_id}", lambda start: weather_station_dao.get_weather_observation(weather_station_id, start=start))
 
 # Check if weather observation data have at least one row
-if weather_observation_df.empty:
+if weather_observations.empty:
     st.error("No weather observation data found for this weather station.")
     st.stop()
 
 st.markdown(f'<div class="info-box">You can also Select Date Range</div>', unsafe_allow_html=True)
 st.write("")
-# Convert 'Date' column to datetime
-weather_observation_df['Date'] = pd.to_datetime(weather_observation_df['date'], format='%Y-%m-%d')
 # Add separate date inputs for start and end dates
-min_date = weather_observation_df['Date'].min()
-# set max date to one year after min date
-max_date = weather_observation_df['Date'].max()
+min_date = weather_observations.min_date
+max_date = weather_observations.max_date
 
 # set default date to min date and one year after min date
 if 'date_range' not in st.session_state:
@@ -112,35 +105,12 @@ if len(option) != 2:
 else:
     st.session_state.date_range = option
 
-# Filter the DataFrame based on the selected date range
-mask = (weather_observation_df['Date'] >= pd.to_datetime(st.session_state.date_range[0])) & (weather_observation_df['Date'] <= pd.to_datetime(st.session_state.date_range[1]))
-filtered_df = weather_observation_df[mask]
+# Slice the selected date range out of the observations sorted by date
+filtered_df = weather_observations.slice(st.session_state.date_range[0], st.session_state.date_range[1])
 
-st.dataframe(filtered_df, use_container_width=True)
+st.dataframe(fill_placeholders(filtered_df), use_container_width=True)
 
-# 3 columns to select x-ais, multiple y-axis and plot type
 st.markdown('<div class="info-box">You can also visualize the data on a 2D graph</div>', unsafe_allow_html=True)
 st.write("")
-x_axis, y_axis, plot_type = st.columns(3)
-with x_axis:
-    x_axis = st.selectbox("Select x-axis", filtered_df.columns, index=0)
-with y_axis:
-    y_axis = st.multiselect("Select y-axis", filtered_df.columns, default=[filtered_df.columns[1]])
-with plot_type:
-    plot_type = st.selectbox("Select plot type", ["line", "bar", "area", "scatter"], index=3)
-
-# Check if y-axis is selected
-if y_axis:
-    try:
-        if plot_type == "line":
-            st.line_chart(filtered_df, x=x_axis, y=y_axis, use_container_width=True)
-        elif plot_type == "bar":
-            st.bar_chart(filtered_df, x=x_axis, y=y_axis, use_container_width=True)
-        elif plot_type == "area":
-            st.area_chart(filtered_df, x=x_axis, y=y_axis, use_container_width=True)
-        elif plot_type == "scatter":
-            st.scatter_chart(filtered_df, x=x_axis, y=y_axis, use_container_width=True)
-        else:
-            st.info("Please select a plot type to display the data.")
-    except Exception as e:
-        st.info("Something went wrong. Please select a different x-axis or y-axis to display the data.")
+# Chart controls rerun only the chart, the observations above are not fetched again
+chart_explorer(filtered_df)
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+from components.downsampling import lttb_indices, min_max_indices, downsample_chart_data
+
+values = np.sin(np.linspace(0, 20, 10000))
+values[1234] = 5.0
+
+def test_lttb_keeps_endpoints_and_peaks():
+    indices = lttb_indices(np.arange(values.size, dtype="float64"), values, 500)
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == values.size - 1
+    assert 1234 in indices
+
+def test_min_max_keeps_extremes():
+    indices = min_max_indices(values, 100)
+    assert len(indices) <= 202
+    assert 1234 in indices
+
+def test_downsample_chart_data():
+    data = pd.DataFrame({"date": pd.date_range("2000-01-01", periods=values.size), "value": values})
+    assert len(downsample_chart_data(data, "date", ["value"], "line", width=300)) == 300
+    assert len(downsample_chart_data(data, "date", ["value"], "bar", width=400)) == 100
+    assert len(downsample_chart_data(data.head(100), "date", ["value"], "scatter", width=300)) == 100
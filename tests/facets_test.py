@@ -0,0 +1,38 @@
+import pandas as pd
+from api.facets import FacetIndex, UNKNOWN
+
+treatments = pd.DataFrame({
+    "coverCrop": pd.Categorical(["rye", "rye", "clover", None]),
+    "irrigation": pd.array([True, False, None, True], dtype="boolean"),
+    "numericNitrogen": [0.0, 120.0, None, 60.0],
+})
+index = FacetIndex(treatments, ["coverCrop", "irrigation"], range_column="numericNitrogen")
+
+def test_options_without_filters():
+    mask, options = index.query({"coverCrop": None, "numericNitrogen": index.range})
+    assert mask.tolist() == [True, True, False, True]
+    assert options["coverCrop"] == ["rye", UNKNOWN]
+    assert options["irrigation"] == [False, True]
+
+def test_filters_are_combined():
+    mask, options = index.query({"coverCrop": "rye", "irrigation": True, "numericNitrogen": (0.0, 200.0)})
+    assert mask.tolist() == [True, False, False, False]
+    assert options["irrigation"] == [True]
+
+def test_unknown_and_range():
+    mask, _ = index.query({"coverCrop": UNKNOWN, "numericNitrogen": (50.0, 60.0)})
+    assert mask.tolist() == [False, False, False, True]
+    assert index.range == (0.0, 120.0)
+
+locations = pd.DataFrame({
+    "state": ["NE", "NE", "IA", "IA"],
+    "county": ["Lancaster", "Saunders", "Story", "Story"],
+})
+location_index = FacetIndex(locations, ["state", "county"], levels=["state", "county"])
+
+def test_counts():
+    assert location_index.counts("state", location_index.mask({"county": "Story"})) == {"IA": 2}
+
+def test_prune_drops_children_of_other_parents():
+    assert location_index.prune({"state": "IA", "county": "Lancaster"}) == {"state": "IA", "county": None}
+    assert location_index.prune({"state": "NE", "county": "Lancaster"}) == {"state": "NE", "county": "Lancaster"}
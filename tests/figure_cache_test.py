@@ -0,0 +1,22 @@
+import plotly.graph_objects as go
+from components.figure_cache import FigureCache
+
+def figure(title):
+    return lambda: go.Figure(layout={"title": title})
+
+def test_hit_does_not_rebuild():
+    cache = FigureCache()
+    first = cache.get("a", figure("a"))
+    assert cache.get("a", lambda: 1 / 0) is first
+
+def test_least_recently_used_is_evicted():
+    probe = FigureCache()
+    probe.get("a", figure("a"))
+    size = probe.size
+    cache = FigureCache(max_bytes=2 * size)
+    cache.get("a", figure("a"))
+    cache.get("b", figure("b"))
+    cache.get("a", figure("a"))
+    cache.get("c", figure("c"))
+    assert len(cache) == 2
+    assert cache.get("a", lambda: 1 / 0)
@@ -0,0 +1,45 @@
+from api.frames import materialize, property_dtype
+
+class Result:
+
+    def __init__(self, keys, records):
+        self._keys = keys
+        self._records = records
+
+    def keys(self):
+        return self._keys
+
+    def __iter__(self):
+        return iter(self._records)
+
+def test_declared_schema():
+    result = Result(["date", "value"], [("2020-01-02", 1.5), ("2020-01-03", None)])
+    df = materialize(result, schema={"date": "datetime64[ns]", "value": "float64"})
+    assert str(df["date"].dtype) == "datetime64[ns]"
+    assert df["value"].isna().tolist() == [False, True]
+
+def test_properties_are_spread():
+    result = Result(["properties", "coverCrop"], [({"a": 1, "coverCrop": "x"}, "rye"), ({"b": "y"}, None)])
+    df = materialize(result, properties="properties")
+    assert list(df.columns) == ["coverCrop", "a", "b"]
+    assert df["coverCrop"].tolist()[0] == "rye"
+    assert str(df["a"].dtype) == "Int64"
+    assert df["a"].isna().tolist() == [False, True]
+
+def test_empty_result():
+    df = materialize(Result(["a"], []))
+    assert list(df.columns) == ["a"] and df.empty
+
+def test_property_dtype_schema():
+    result = Result(["properties"], [({"expUnitId": "U1", "soilBiolDate": "2020-01-02", "mbc_mg_per_kg": 1, "note": "x"},), ({"expUnitId": "U1", "mbc_mg_per_kg": "n/a"},)])
+    df = materialize(result, schema=property_dtype, properties="properties")
+    assert str(df["expUnitId"].dtype) == "category"
+    assert str(df["soilBiolDate"].dtype) == "datetime64[ns]"
+    # a declared dtype the values do not fit falls back to inference
+    assert df["mbc_mg_per_kg"].tolist() == [1, "n/a"]
+    assert df["note"].tolist()[0] == "x"
+
+def test_free_text_dates_are_kept():
+    result = Result(["harvestDate"], [("2010-05-01",), ("Fall 2011",), ("unknown",)])
+    df = materialize(result, schema=property_dtype)
+    assert df["harvestDate"].tolist() == ["2010-05-01", "Fall 2011", "unknown"]
@@ -0,0 +1,12 @@
+from api.search import IdIndex
+
+index = IdIndex(["NEMEAD1", "nebr2", "IAAMES1", "xne", "B"])
+
+def test_prefix_matches_first():
+    assert index.search("ne") == ["nebr2", "NEMEAD1", "xne"]
+
+def test_limit():
+    assert len(index.search("", limit=2)) == 2
+
+def test_no_match():
+    assert index.search("zz") == []
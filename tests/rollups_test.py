@@ -0,0 +1,28 @@
+import pandas as pd
+from api.rollups import compute_rollups
+
+daily = pd.DataFrame({
+    "date": ["2020-01-01", "2020-01-01", "2020-02-03", "2020-04-01", "2021-12-31"],
+    "precipitation_mm_per_d": [1.0, 2.0, None, 4.0, 5.0],
+    "maxTemperature_degC": [10.0, 20.0, 30.0, None, 0.0],
+})
+
+rollups = compute_rollups(daily)
+
+def test_precipitation_is_summed():
+    assert rollups["Daily"]["precipitation_mm_per_d"].tolist()[0] == 3.0
+    assert rollups["Yearly"]["precipitation_mm_per_d"].tolist() == [7.0, 5.0]
+
+def test_other_variables_are_averaged_over_observations():
+    quarterly = rollups["Quarterly"]
+    assert quarterly["Period"].tolist() == ["2020-Q1", "2020-Q2", "2021-Q4"]
+    assert quarterly["maxTemperature_degC"].tolist()[0] == 20.0
+    assert pd.isna(quarterly["maxTemperature_degC"].tolist()[1])
+
+def test_period_labels():
+    assert rollups["Monthly"]["Period"].tolist() == ["2020-01", "2020-02", "2020-04", "2021-12"]
+    assert rollups["Yearly"]["Period"].tolist() == ["2020", "2021"]
+
+def test_no_numeric_variables():
+    empty = compute_rollups(pd.DataFrame({"date": ["2020-01-01"], "note": ["x"]}))
+    assert all(list(frame.columns) == ["Period"] and frame.empty for frame in empty.values())
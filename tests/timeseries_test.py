@@ -0,0 +1,28 @@
+import pandas as pd
+import api.timeseries as timeseries
+
+def test_incremental_sync_and_slice(tmp_path, monkeypatch):
+    monkeypatch.setattr(timeseries, "TIMESERIES_DIR", str(tmp_path))
+    fingerprints = iter(["a", "b"])
+    monkeypatch.setattr(timeseries, "get_graph_fingerprint", lambda: next(fingerprints))
+    observations = pd.DataFrame({
+        "date": ["2020-01-01", "2020-01-02", "2020-01-03", "2020-01-04"],
+        "rain": [1.0, 2.0, 3.0, 4.0],
+        "snow": [0.0, 0.0, 0.0, 0.0],
+    })
+    calls = []
+    def load(start):
+        calls.append(start)
+        # the second sync sees one more observation
+        rows = observations if len(calls) > 1 else observations.iloc[:3]
+        return rows[pd.to_datetime(rows["date"]) >= start] if start is not None else rows
+
+    series = timeseries.TimeSeries("station", load).sync()
+    assert series.max_date == pd.Timestamp("2020-01-03")
+    series.sync()
+    assert calls == [None, pd.Timestamp("2020-01-04")]
+    assert series.max_date == pd.Timestamp("2020-01-04")
+
+    frame = series.slice("2020-01-02", "2020-01-03")
+    assert frame["rain"].tolist() == [2.0, 3.0]
+    assert "snow" not in frame.columns
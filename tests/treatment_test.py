@@ -0,0 +1,8 @@
+import pandas as pd
+from api.dao.treatment import extract_numeric_values
+
+def test_extract_numeric_values():
+    descriptors = pd.Series(["120 kg N/ha", " None ", "Zero nitrogen fertilizer (ZN)", "split 33.5 + 40", "unknown rate", None])
+    values = extract_numeric_values(descriptors).tolist()
+    assert values[:4] == [120.0, 0.0, 0.0, 33.5]
+    assert pd.isna(values[4]) and pd.isna(values[5])
@@ -1,4 +1,6 @@
 from langchain.chains import GraphCypherQAChain
+from langchain_community.chains.graph_qa.cypher import extract_cypher
+from langchain_community.chains.graph_qa.cypher_utils import CypherQueryCorrector, Schema
 from langchain_core.prompts.prompt import PromptTemplate
 from langchain_core.prompts import FewShotPromptTemplate
 from langchain_core.example_selectors import SemanticSimilarityExampleSelector
@@ -7,6 +9,7 @@ from templates.examples import examples
 from templates.prefix_prompt import prefix_prompt
 from models.llms import gemini_pro
 from neo4j_connector.graph import neo4j_graph
+from api.catalog import on_catalog_refresh
 from models.embeddings import llama3_embeddings
 
 
@@ -38,23 +41,34 @@ chain = GraphCypherQAChain.from_llm(
     verbose=True,
     validate_cypher=True,
     cypher_prompt=prompt,
-    return_intermediate_steps=True,
 )
 
+# The chain copies the schema when it is built, give it the new one whenever the catalog is rebuilt
+def apply_catalog(catalog):
+    chain.graph_schema = catalog.get_schema_string()
+    relationships = catalog.get_structured_schema()["relationships"]
+    chain.cypher_query_corrector = CypherQueryCorrector([Schema(rel["start"], rel["type"], rel["end"]) for rel in relationships])
+
+on_catalog_refresh(apply_catalog)
+
+# Only generate the Cypher: invoking the whole chain would also run the generated query against the
+# graph without any guard. The caller runs it through GeneralDAO.run_guarded_query.
 def generate_cypher(prompt_text):
+    generation_chain = chain.cypher_generation_chain
     attempt = 3
     while attempt > 0:
         try:
-            response = chain.invoke({"query":prompt_text})
+            response = generation_chain.invoke({"question": prompt_text, "schema": chain.graph_schema})
             break
         except Exception as e:
             attempt -= 1
             if attempt == 0:
                 raise Exception("Sorry, I could not process your request. Please rephrase your promp using Prompts Tips or try again later.")
     
-    # check if intermediate steps are present in response
-    if 'intermediate_steps' not in response:
+    constructed_cypher = extract_cypher(response[generation_chain.output_key])
+    # correct relationship directions against the schema, as the chain does with validate_cypher
+    if chain.cypher_query_corrector:
+        constructed_cypher = chain.cypher_query_corrector(constructed_cypher)
+    if not constructed_cypher:
         raise Exception("Sorry, I could not process your request. Please try to rephrase your question or try again later.")
-    
-    constructed_cypher = response['intermediate_steps'][0]['query']
     return {"constructed_cypher": constructed_cypher}